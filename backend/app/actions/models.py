@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, String, Text, Index
+from sqlalchemy import DateTime, Integer, LargeBinary, String, Text, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -17,6 +17,8 @@ class Action(Base):
     """
 
     __tablename__ = "actions"
+    # Range-partitioned by time on Postgres (see app.db.partitions)
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
@@ -34,20 +36,51 @@ class Action(Base):
     action_type: Mapped[str] = mapped_column(
         String(32),
         nullable=False,
-        doc="mouse_move | mouse_click | key_press | key_release",
+        doc="mouse_move | mouse_trace | mouse_click | key_press | key_release | hotkey",
     )
 
     parameters: Mapped[str] = mapped_column(
         Text,
         nullable=False,
-        doc="Serialized parameters (e.g. x,y,button,key)",
+        doc="Serialized parameters as sent (e.g. x,y,button,key)",
     )
 
+    # Typed parameters (queryable; see indexes below)
+    x: Mapped[int | None] = mapped_column(Integer, nullable=True, doc="Pointer x (end point for traces)")
+    y: Mapped[int | None] = mapped_column(Integer, nullable=True, doc="Pointer y (end point for traces)")
+    button: Mapped[str | None] = mapped_column(String(16), nullable=True, doc="left | right | middle")
+    key: Mapped[str | None] = mapped_column(String(64), nullable=True, doc="Key or '+'-joined key combination")
+
+    trace: Mapped[bytes | None] = mapped_column(
+        LargeBinary,
+        nullable=True,
+        deferred=True,  # not loaded with the row; fetched by /actions/trace/{id}
+        doc="Compact mouse-move trace (ui_formats.movetrace) for mouse_trace actions",
+    )
+    trace_points: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Part of the primary key: partitioned tables require the partition key in it
     occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    ingested_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
+        server_default=func.now(),
         nullable=False,
+        doc="When the backend stored the row (occurred_at is client time)",
     )
 
 
-Index("ix_actions_execution_time", Action.execution_id, Action.occurred_at)
+# Timeline order within an execution: (at, id) is the timeline sort key
+Index("ix_actions_execution_time", Action.execution_id, Action.occurred_at, Action.id)
+# Arrival order within an execution (live stream catch-up)
+Index("ix_actions_execution_ingested", Action.execution_id, Action.ingested_at, Action.id)
+# "clicks near (x, y)": range on x within one action type, y filtered in the index
+Index("ix_actions_type_xy", Action.action_type, Action.x, Action.y)
+# "key presses of ctrl"
+Index("ix_actions_type_key", Action.action_type, Action.key)
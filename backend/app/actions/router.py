@@ -1,13 +1,22 @@
+import base64
+import binascii
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ui_formats.movetrace import TraceDecodeError, decode_trace
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.audit.writer import audit_writer
 from app.actions.models import Action
-from app.executions.models import Execution
+from app.executions.cache import require_live_execution, require_live_executions
+from app.executions.events import event_broker
+from app.executions.timeline import timeline_event
 
-router = APIRouter()
+router = APIRouter(prefix="/actions")
 
 
 # ---------
@@ -17,8 +26,14 @@ router = APIRouter()
 class ActionCreate(BaseModel):
     execution_id: str
     action_type: str
-    parameters: str
+    parameters: str = ""
     occurred_at: datetime | None = None
+    x: int | None = None
+    y: int | None = None
+    button: str | None = None
+    key: str | None = None
+    # base64 of the compact trace encoding (mouse_trace actions)
+    trace: str | None = None
 
 
 class ActionResponse(BaseModel):
@@ -27,6 +42,63 @@ class ActionResponse(BaseModel):
     action_type: str
     parameters: str
     occurred_at: datetime
+    x: int | None = None
+    y: int | None = None
+    button: str | None = None
+    key: str | None = None
+    trace_points: int | None = None
+
+
+class TraceResponse(BaseModel):
+    action_id: str
+    # (t_ms, x, y), t relative to occurred_at
+    points: list[tuple[int, int, int]]
+
+
+class ActionBatchResponse(BaseModel):
+    ids: list[str]
+
+
+# ---------
+# Helpers
+# ---------
+
+def parse_legacy_parameters(parameters: str) -> dict:
+    """
+    Best-effort split of the free-form "x,y,button,key" string; fields
+    that are missing or not parseable stay None.
+    """
+    parts = [p.strip() for p in parameters.split(",")]
+    out = {}
+    if len(parts) >= 2:
+        try:
+            out["x"], out["y"] = int(parts[0]), int(parts[1])
+        except ValueError:
+            pass
+    if len(parts) >= 3 and parts[2]:
+        out["button"] = parts[2][:16]
+    if len(parts) >= 4 and parts[3]:
+        out["key"] = parts[3][:64]
+    return out
+
+
+def structured_fields(p: ActionCreate) -> dict:
+    fields = {"x": p.x, "y": p.y, "button": p.button, "key": p.key, "trace": None, "trace_points": None}
+
+    if p.trace is not None:
+        try:
+            blob = base64.b64decode(p.trace, validate=True)
+            points = decode_trace(blob)
+        except (binascii.Error, TraceDecodeError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid trace: {e}")
+        fields["trace"] = blob
+        fields["trace_points"] = len(points)
+        if fields["x"] is None and fields["y"] is None:
+            fields["x"], fields["y"] = points[-1][1], points[-1][2]
+    elif all(fields[k] is None for k in ("x", "y", "button", "key")) and p.parameters:
+        fields.update(parse_legacy_parameters(p.parameters))
+
+    return fields
 
 
 # ---------
@@ -38,40 +110,142 @@ class ActionResponse(BaseModel):
     response_model=ActionResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_action(
+async def create_action(
     payload: ActionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Ensure execution exists
-    execution = db.get(Execution, payload.execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    # Ensure execution exists and is still running
+    await require_live_execution(db, payload.execution_id)
 
     action = Action(
         execution_id=payload.execution_id,
         action_type=payload.action_type,
         parameters=payload.parameters,
         occurred_at=payload.occurred_at or datetime.utcnow(),
+        **structured_fields(payload),
     )
 
     db.add(action)
-    db.commit()
-    db.refresh(action)
+    await db.commit()
+    await db.refresh(action)
+
+    audit_writer.emit("action_recorded", "action", action.id, metadata={"execution_id": action.execution_id})
+    event_broker.publish(action.execution_id, timeline_event(
+        "action", action.id, action.occurred_at, action_type=action.action_type, parameters=action.parameters
+    ))
     return action
 
 
+@router.post(
+    "/batch",
+    response_model=ActionBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_actions_batch(
+    payload: list[ActionCreate],
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not payload:
+        return ActionBatchResponse(ids=[])
+
+    # Ensure every referenced execution exists and is running (one query at most)
+    await require_live_executions(db, {p.execution_id for p in payload})
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid4()),
+            "execution_id": p.execution_id,
+            "action_type": p.action_type,
+            "parameters": p.parameters,
+            "occurred_at": p.occurred_at or now,
+            "ingested_at": now,
+            **structured_fields(p),
+        }
+        for p in payload
+    ]
+
+    # Single multi-row INSERT, single commit
+    await db.execute(insert(Action), rows)
+    await db.commit()
+
+    for r in rows:
+        audit_writer.emit("action_recorded", "action", r["id"], metadata={"execution_id": r["execution_id"]})
+        event_broker.publish(r["execution_id"], timeline_event(
+            "action", r["id"], r["occurred_at"], action_type=r["action_type"], parameters=r["parameters"]
+        ))
+    return ActionBatchResponse(ids=[r["id"] for r in rows])
+
+
+# Registered before /{execution_id}, which would otherwise match "search"
+@router.get(
+    "/search",
+    response_model=list[ActionResponse],
+)
+async def search_actions(
+    action_type: str | None = None,
+    execution_id: str | None = None,
+    x: int | None = None,
+    y: int | None = None,
+    radius: int = Query(default=0, ge=0),
+    button: str | None = None,
+    key: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Actions by typed parameters, most recent first. With x and y, returns
+    actions within `radius` pixels of (x, y).
+    """
+    if (x is None) != (y is None):
+        raise HTTPException(status_code=400, detail="x and y must be given together")
+
+    query = select(Action)
+    if action_type is not None:
+        query = query.where(Action.action_type == action_type)
+    if execution_id is not None:
+        query = query.where(Action.execution_id == execution_id)
+    if x is not None:
+        # Bounding box (index range), then the exact circle
+        query = query.where(
+            Action.x.between(x - radius, x + radius),
+            Action.y.between(y - radius, y + radius),
+            (Action.x - x) * (Action.x - x) + (Action.y - y) * (Action.y - y) <= radius * radius,
+        )
+    if button is not None:
+        query = query.where(Action.button == button)
+    if key is not None:
+        query = query.where(Action.key == key)
+
+    rows = await db.scalars(query.order_by(Action.occurred_at.desc()).limit(limit))
+    return rows.all()
+
+
+@router.get(
+    "/trace/{action_id}",
+    response_model=TraceResponse,
+)
+async def get_action_trace(
+    action_id: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    blob = await db.scalar(select(Action.trace).where(Action.id == action_id))
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Action not found or has no trace")
+    return TraceResponse(action_id=action_id, points=decode_trace(blob))
+
+
 @router.get(
     "/{execution_id}",
     response_model=list[ActionResponse],
 )
-def list_actions_for_execution(
+async def list_actions_for_execution(
     execution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    rows = (
-        db.query(Action)
-        .filter(Action.execution_id == execution_id)
+    rows = await db.scalars(
+        select(Action)
+        .where(Action.execution_id == execution_id)
         .order_by(Action.occurred_at.asc())
-        .all()
     )
-    return rows
+    return rows.all()
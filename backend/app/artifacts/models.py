@@ -61,4 +61,11 @@ class Artifact(Base):
     )
 
 
+# Derived records with no stored object (e.g. pixel_delta: "before->after")
+DERIVED_ARTIFACT_TYPES = {"pixel_delta"}
+
 Index("ix_artifacts_execution_type", Artifact.execution_id, Artifact.artifact_type)
+# Timeline order within an execution: (at, id) is the timeline sort key
+Index("ix_artifacts_execution_time", Artifact.execution_id, Artifact.created_at, Artifact.id)
+# Keyset scans in time order (integrity sweep)
+Index("ix_artifacts_time_id", Artifact.created_at, Artifact.id)
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.audit.writer import audit_writer
 from app.artifacts.models import Artifact
-from app.executions.models import Execution
+from app.executions.cache import require_live_execution, require_live_executions
+from app.executions.events import event_broker
+from app.executions.timeline import timeline_event
 
-router = APIRouter()
+router = APIRouter(prefix="/artifacts")
 
 
 # ---------
@@ -26,7 +33,11 @@ class ArtifactResponse(BaseModel):
     artifact_type: str
     storage_uri: str
     checksum: str
-    created_at: str
+    created_at: datetime
+
+
+class ArtifactBatchResponse(BaseModel):
+    ids: list[str]
 
 
 # ---------
@@ -38,14 +49,12 @@ class ArtifactResponse(BaseModel):
     response_model=ArtifactResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_artifact(
+async def create_artifact(
     payload: ArtifactCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Ensure execution exists
-    execution = db.get(Execution, payload.execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    # Ensure execution exists and is still running
+    await require_live_execution(db, payload.execution_id)
 
     artifact = Artifact(
         execution_id=payload.execution_id,
@@ -55,23 +64,69 @@ def create_artifact(
     )
 
     db.add(artifact)
-    db.commit()
-    db.refresh(artifact)
+    await db.commit()
+    await db.refresh(artifact)
+
+    audit_writer.emit("artifact_uploaded", "artifact", artifact.id, metadata={"execution_id": artifact.execution_id})
+    event_broker.publish(artifact.execution_id, timeline_event(
+        "artifact", artifact.id, artifact.created_at, artifact_type=artifact.artifact_type,
+        storage_uri=artifact.storage_uri, checksum=artifact.checksum,
+    ))
     return artifact
 
 
+@router.post(
+    "/batch",
+    response_model=ArtifactBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_artifacts_batch(
+    payload: list[ArtifactCreate],
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not payload:
+        return ArtifactBatchResponse(ids=[])
+
+    # Ensure every referenced execution exists and is running (one query at most)
+    await require_live_executions(db, {p.execution_id for p in payload})
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid4()),
+            "execution_id": p.execution_id,
+            "artifact_type": p.artifact_type,
+            "storage_uri": str(p.storage_uri),
+            "checksum": p.checksum,
+            "created_at": now,
+        }
+        for p in payload
+    ]
+
+    # Single multi-row INSERT, single commit
+    await db.execute(insert(Artifact), rows)
+    await db.commit()
+
+    for r in rows:
+        audit_writer.emit("artifact_uploaded", "artifact", r["id"], metadata={"execution_id": r["execution_id"]})
+        event_broker.publish(r["execution_id"], timeline_event(
+            "artifact", r["id"], r["created_at"], artifact_type=r["artifact_type"],
+            storage_uri=r["storage_uri"], checksum=r["checksum"],
+        ))
+    return ArtifactBatchResponse(ids=[r["id"] for r in rows])
+
+
 @router.get(
     "/{execution_id}",
     response_model=list[ArtifactResponse],
 )
-def list_artifacts_for_execution(
+async def list_artifacts_for_execution(
     execution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    rows = (
-        db.query(Artifact)
-        .filter(Artifact.execution_id == execution_id)
+    rows = await db.scalars(
+        select(Artifact)
+        .where(Artifact.execution_id == execution_id)
         .order_by(Artifact.created_at.asc())
-        .all()
     )
-    return rows
+    return rows.all()
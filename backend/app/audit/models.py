@@ -23,6 +23,8 @@ class AuditEvent(Base):
     """
 
     __tablename__ = "audit_events"
+    # Range-partitioned by time on Postgres (see app.db.partitions)
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
@@ -60,14 +62,18 @@ class AuditEvent(Base):
         doc="ID of the target object",
     )
 
-    metadata: Mapped[str | None] = mapped_column(
+    # "metadata" is reserved on declarative classes; column name is unchanged
+    metadata_: Mapped[str | None] = mapped_column(
+        "metadata",
         Text,
         nullable=True,
         doc="Optional JSON-serialized metadata",
     )
 
+    # Part of the primary key: partitioned tables require the partition key in it
     occurred_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=datetime.utcnow,
         nullable=False,
     )
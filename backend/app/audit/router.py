@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+import base64
+from datetime import datetime
 
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_db
 from app.audit.models import AuditEvent
 
-router = APIRouter()
+router = APIRouter(prefix="/audit")
+
+MAX_PAGE_SIZE = 1000
 
 
 # ---------
@@ -19,8 +25,31 @@ class AuditEventResponse(BaseModel):
     action: str
     target_type: str
     target_id: str
-    metadata: str | None
-    occurred_at: str
+    metadata: str | None = Field(validation_alias="metadata_")
+    occurred_at: datetime
+
+
+class AuditEventPage(BaseModel):
+    items: list[AuditEventResponse]
+    next_cursor: str | None
+
+
+# ---------
+# Cursor
+# ---------
+
+def encode_cursor(occurred_at: datetime, event_id: str) -> str:
+    raw = f"{occurred_at.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, event_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), event_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 # ---------
@@ -29,18 +58,51 @@ class AuditEventResponse(BaseModel):
 
 @router.get(
     "/events",
-    response_model=list[AuditEventResponse],
+    response_model=AuditEventPage,
 )
-def list_audit_events(
-    db: Session = Depends(get_db),
+async def list_audit_events(
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    target_type: str | None = None,
+    target_id: str | None = None,
+    actor_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Read-only access to audit events.
-    No filters for now. No deletes. No writes.
+    Read-only access to audit events. No deletes. No writes.
+
+    Newest first, keyset-paginated on (occurred_at, id): pass the returned
+    next_cursor to fetch the following page. Cost per page is independent
+    of table size.
     """
-    rows = (
-        db.query(AuditEvent)
-        .order_by(AuditEvent.occurred_at.desc())
-        .all()
-    )
-    return rows
+    query = select(AuditEvent)
+
+    if target_type is not None:
+        query = query.where(AuditEvent.target_type == target_type)
+    if target_id is not None:
+        query = query.where(AuditEvent.target_id == target_id)
+    if actor_type is not None:
+        query = query.where(AuditEvent.actor_type == actor_type)
+    if since is not None:
+        query = query.where(AuditEvent.occurred_at >= since)
+    if until is not None:
+        query = query.where(AuditEvent.occurred_at < until)
+    if cursor is not None:
+        ts, event_id = decode_cursor(cursor)
+        query = query.where(tuple_(AuditEvent.occurred_at, AuditEvent.id) < tuple_(ts, event_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.scalars(
+        query
+        .order_by(AuditEvent.occurred_at.desc(), AuditEvent.id.desc())
+        .limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id)
+
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,331 @@
+"""
+Asynchronous, batched audit writer.
+
+Request handlers call audit_writer.emit(); the event is queued in memory
+and returns immediately. A background task drains the queue and writes
+events with one multi-row INSERT per batch, flushing when the batch is
+full or when flush_interval elapses. stop() drains everything that is
+still queued, so shutdown never loses events.
+
+A batch that still fails after max_retries is appended to a per-process
+JSONL spool file (AUDIT_SPOOL_DIR) and replayed after the next successful
+write, or by the next process to start. Spool files of processes that
+are gone are adopted, so events survive a crash during an outage. Only
+events that cannot be spooled either are dropped: that is logged as
+critical and turns /health to "degraded".
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.audit.models import AuditEvent
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _owner(path: Path) -> int:
+    # audit-<pid>.jsonl, audit-<pid>.<n>.replay
+    return int(path.name.split("-", 1)[1].split(".", 1)[0])
+
+
+class AuditWriter:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        async_session_factory=AsyncSessionLocal,
+        max_batch: int = 500,
+        flush_interval: float = 0.25,
+        max_retries: int = 3,
+        spool_dir: str | Path = settings.AUDIT_SPOOL_DIR,
+    ):
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.spool_dir = Path(spool_dir)
+
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: asyncio.Future | None = None
+
+        self.written = 0
+        # Events waiting in spool files / lost for good
+        self.spooled = 0
+        self.dropped = 0
+        self._replays = 0
+
+    # ---------
+    # Producer side
+    # ---------
+
+    def emit(
+        self,
+        action: str,
+        target_type: str,
+        target_id: str,
+        actor_type: str = "executor",
+        actor_id: str | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        """
+        Queue one audit event. Safe to call from async endpoints or from
+        other threads. Never blocks on the database.
+        """
+        row = {
+            "id": str(uuid4()),
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "metadata_": json.dumps(metadata) if metadata is not None else None,
+            "occurred_at": datetime.utcnow(),
+        }
+
+        if self._loop is None:
+            # Not running inside the app (scripts, maintenance jobs)
+            self._write([row])
+            return
+
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if in_loop:
+            self._queue.put_nowait(row)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, row)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.dropped == 0
+
+    # ---------
+    # Lifecycle
+    # ---------
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+        # Leftovers of an earlier process (or of a crashed sibling)
+        self.spooled = await asyncio.to_thread(self._count_spooled)
+        if self.spooled:
+            self._queue.put_nowait(None)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._inflight is not None:
+            await self._inflight
+
+        # Let call_soon_threadsafe callbacks already scheduled land in the queue
+        await asyncio.sleep(0)
+        while not self._queue.empty():
+            await self._flush(self._drain(self.max_batch))
+
+        self._task = None
+        self._loop = None
+
+    # ---------
+    # Consumer side
+    # ---------
+
+    def _drain(self, limit: int) -> list[dict]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                batch.append(row)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                row = await self._queue.get()
+                if row is None:
+                    # Replay request from start()
+                    await self._replay()
+                    continue
+                batch.append(row)
+                deadline = self._loop.time() + self.flush_interval
+
+                while len(batch) < self.max_batch:
+                    batch.extend(self._drain(self.max_batch - len(batch)))
+                    remaining = deadline - self._loop.time()
+                    if len(batch) >= self.max_batch or remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Cancelled mid-collection: don't lose what was dequeued
+                await self._flush(batch)
+                raise
+
+            # Shield so a shutdown cancel never abandons a half-written batch
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self._write_async(batch)
+                break
+            except Exception:
+                logger.exception("audit batch write failed (attempt %d/%d)", attempt, self.max_retries)
+                await asyncio.sleep(0.1 * attempt)
+        else:
+            await asyncio.to_thread(self._spool, batch)
+            return
+        if self.spooled:
+            # The database is back: replay what failed earlier
+            await self._replay()
+
+    async def _write_async(self, batch: list[dict]) -> None:
+        async with self.async_session_factory() as db:
+            await db.execute(insert(AuditEvent), batch)
+            await db.commit()
+        self.written += len(batch)
+
+    async def _write_replayed(self, batch: list[dict]) -> None:
+        try:
+            await self._write_async(batch)
+        except IntegrityError:
+            # Part of the batch landed before a crash mid-replay: ids are
+            # fixed at emit time, so skip the rows already written
+            for row in batch:
+                try:
+                    await self._write_async([row])
+                except IntegrityError:
+                    pass
+
+    # ---------
+    # Disk spool
+    # ---------
+
+    def _spool_file(self) -> Path:
+        return self.spool_dir / f"audit-{os.getpid()}.jsonl"
+
+    def _spool(self, batch: list[dict]) -> None:
+        lines = "".join(
+            json.dumps({**row, "occurred_at": row["occurred_at"].isoformat()}) + "\n" for row in batch
+        )
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._spool_file(), "a") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            self.dropped += len(batch)
+            logger.critical("audit spool %s unwritable: %d audit events lost", self.spool_dir, len(batch),
+                            exc_info=True)
+            return
+        self.spooled += len(batch)
+        logger.error("audit batch of %d events spooled to %s", len(batch), self._spool_file())
+
+    def _claimable(self) -> list[Path]:
+        # Our own spool, plus spool/replay files of processes that are gone
+        if not self.spool_dir.is_dir():
+            return []
+        pid = os.getpid()
+        return sorted(
+            path
+            for pattern in ("audit-*.jsonl", "audit-*.replay")
+            for path in self.spool_dir.glob(pattern)
+            if _owner(path) == pid or not _pid_alive(_owner(path))
+        )
+
+    def _count_spooled(self) -> int:
+        count = 0
+        for path in self._claimable():
+            with open(path) as f:
+                count += sum(1 for _ in f)
+        return count
+
+    def _claim(self) -> list[Path]:
+        """
+        Rename claimable files to replay files of this process, so new
+        spooling goes to a fresh file and no other process replays them.
+        """
+        claimed = []
+        for path in self._claimable():
+            self._replays += 1
+            target = self.spool_dir / f"audit-{os.getpid()}.{self._replays}.replay"
+            try:
+                path.rename(target)
+            except FileNotFoundError:
+                continue  # claimed by another process
+            claimed.append(target)
+        return claimed
+
+    async def _replay(self) -> None:
+        for path in await asyncio.to_thread(self._claim):
+            with open(path) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            for row in rows:
+                row["occurred_at"] = datetime.fromisoformat(row["occurred_at"])
+            for i in range(0, len(rows), self.max_batch):
+                batch = rows[i:i + self.max_batch]
+                try:
+                    await self._write_replayed(batch)
+                except Exception:
+                    # Still failing: back to the spool, retried after the next successful write
+                    logger.exception("audit spool replay failed")
+                    self.spooled -= len(rows) - i
+                    await asyncio.to_thread(self._spool, rows[i:])
+                    path.unlink()
+                    return
+                self.spooled -= len(batch)
+            path.unlink()
+            logger.info("replayed %d spooled audit events", len(rows))
+
+    def _write(self, batch: list[dict]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditEvent), batch)
+            db.commit()
+            self.written += len(batch)
+        finally:
+            db.close()
+
+
+audit_writer = AuditWriter()
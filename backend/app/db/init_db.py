@@ -2,11 +2,15 @@
 Database initialization script.
 
 Creates all tables defined in SQLAlchemy models.
+On Postgres, observations/actions/audit_events are created as time-range
+partitioned tables and the initial partitions are created as well
+(app.db.partitions keeps them rolling afterwards).
 Run this ONCE before starting the backend.
 """
 
 from app.db.session import engine
 from app.db.base import Base
+from app.db.partitions import ensure_partitions
 
 # Import all models so they are registered with SQLAlchemy metadata
 from app.executions.models import Execution
@@ -14,11 +18,16 @@ from app.observations.models import Observation
 from app.actions.models import Action
 from app.artifacts.models import Artifact
 from app.audit.models import AuditEvent
+from app.integrity.models import IntegrityWatermark
 
 
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
 
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            ensure_partitions(conn)
+
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,212 @@
+"""
+Time-range partition maintenance (Postgres only).
+
+observations, actions and audit_events are declared PARTITION BY RANGE on
+their timestamp. This module:
+
+- pre-creates partitions from the current period up to PARTITION_PREMAKE
+  periods ahead;
+- keeps a DEFAULT partition (<table>_default) for rows outside every
+  range, e.g. events replayed from an executor spool days later, so such
+  inserts never fail. If rows for a range land there before its partition
+  exists, they are moved into the partition when it is created;
+- detaches partitions entirely older than the table's retention window
+  and moves them to PARTITION_ARCHIVE_SCHEMA (or drops them with --drop);
+  expired rows of the DEFAULT partition are archived (or deleted) as well.
+
+Partitions are named <table>_pYYYYMMDD after their (UTC) lower bound.
+Run from cron / a scheduler, e.g. hourly:
+
+    python -m app.db.partitions [--drop]
+"""
+
+import argparse
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import get_settings
+from app.db.session import engine
+
+settings = get_settings()
+
+# table -> retention in days
+PARTITIONED_TABLES = {
+    "observations": settings.OBSERVATIONS_RETENTION_DAYS,
+    "actions": settings.ACTIONS_RETENTION_DAYS,
+    "audit_events": settings.AUDIT_RETENTION_DAYS,
+}
+
+# table -> partition key
+PARTITION_KEYS = {
+    "observations": "captured_at",
+    "actions": "occurred_at",
+    "audit_events": "occurred_at",
+}
+
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<start>\d{8})$")
+
+
+# ---------
+# Bounds
+# ---------
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    start = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    elif interval != "day":
+        raise ValueError(f"Unsupported partition interval: {interval}")
+    return start
+
+
+def period_end(start: datetime, interval: str) -> datetime:
+    return start + (timedelta(weeks=1) if interval == "week" else timedelta(days=1))
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+# ---------
+# Operations
+# ---------
+
+def ensure_partitions(conn: Connection, now: datetime | None = None) -> list[str]:
+    interval = settings.PARTITION_INTERVAL
+    start = period_start(now or datetime.now(timezone.utc), interval)
+    created = []
+
+    for table in PARTITIONED_TABLES:
+        default = default_partition_name(table)
+        if not _exists(conn, default):
+            conn.execute(text(f'CREATE TABLE "{default}" PARTITION OF "{table}" DEFAULT'))
+            created.append(default)
+
+        bound = start
+        for _ in range(settings.PARTITION_PREMAKE + 1):
+            end = period_end(bound, interval)
+            name = partition_name(table, bound)
+            if not _exists(conn, name):
+                _create_partition(conn, table, name, bound, end)
+                created.append(name)
+            bound = end
+
+    return created
+
+
+def _exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def _create_partition(conn: Connection, table: str, name: str, start: datetime, end: datetime) -> None:
+    column = PARTITION_KEYS[table]
+    default = default_partition_name(table)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = f'"{column}" >= :start AND "{column}" < :end'
+    params = {"start": start, "end": end}
+
+    stray = conn.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})'), params
+    ).scalar()
+    if not stray:
+        conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES {bounds}'))
+        return
+
+    # The DEFAULT partition already holds rows of this range: Postgres only
+    # accepts the new partition once they are moved into it
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{default}" WHERE {in_range} RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ), params)
+    conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES {bounds}'))
+
+
+def list_partitions(conn: Connection, table: str) -> list[tuple[str, datetime]]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table})
+
+    partitions = []
+    for (name,) in rows:
+        match = PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            start = datetime.strptime(match["start"], "%Y%m%d").replace(tzinfo=timezone.utc)
+            partitions.append((name, start))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def retire_partitions(conn: Connection, now: datetime | None = None, drop: bool = False) -> list[str]:
+    """
+    Detach partitions whose whole range is past retention; archive or drop.
+    """
+    now = now or datetime.now(timezone.utc)
+    interval = settings.PARTITION_INTERVAL
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    retired = []
+
+    if not drop:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+
+    for table, retention_days in PARTITIONED_TABLES.items():
+        cutoff = now - timedelta(days=retention_days)
+        _retire_default_rows(conn, table, cutoff, schema, drop)
+        for name, start in list_partitions(conn, table):
+            if period_end(start, interval) > cutoff:
+                continue
+            conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            if drop:
+                conn.execute(text(f'DROP TABLE "{name}"'))
+            else:
+                conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+            retired.append(name)
+
+    return retired
+
+
+def _retire_default_rows(conn: Connection, table: str, cutoff: datetime, schema: str, drop: bool) -> None:
+    # Rows past retention that landed in the DEFAULT partition
+    default = default_partition_name(table)
+    if not _exists(conn, default):
+        return
+    expired = f'DELETE FROM "{default}" WHERE "{PARTITION_KEYS[table]}" < :cutoff'
+    if drop:
+        conn.execute(text(expired), {"cutoff": cutoff})
+        return
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{schema}"."{default}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+    conn.execute(text(
+        f'WITH moved AS ({expired} RETURNING *) INSERT INTO "{schema}"."{default}" SELECT * FROM moved'
+    ), {"cutoff": cutoff})
+
+
+def run_maintenance(drop: bool = False) -> tuple[list[str], list[str]]:
+    if engine.dialect.name != "postgresql":
+        return [], []
+    with engine.begin() as conn:
+        created = ensure_partitions(conn)
+        retired = retire_partitions(conn, drop=drop)
+    return created, retired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-create and retire time partitions.")
+    parser.add_argument("--drop", action="store_true", help="drop expired partitions instead of archiving")
+    args = parser.parse_args()
+
+    created, retired = run_maintenance(drop=args.drop)
+    print(f"Partitions created: {len(created)}")
+    for name in created:
+        print(f"  + {name}")
+    print(f"Partitions retired: {len(retired)}")
+    for name in retired:
+        print(f"  - {name}")
@@ -1,10 +1,34 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.config import get_settings
 
 settings = get_settings()
 
+# Sync drivers and their async counterparts
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+# ---------
+# Sync engine (init_db, maintenance jobs, scripts)
+# ---------
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
@@ -31,3 +55,51 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------
+# Async engine (API request path)
+# ---------
+
+def _async_engine_kwargs(url: str) -> dict:
+    kwargs = {"pool_pre_ping": True}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite picks its own pool (StaticPool/NullPool for some URLs),
+        # which rejects queue pool sizing
+        return kwargs
+
+    kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {
+            # SQLAlchemy-side and asyncpg-side prepared statement caches
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return kwargs
+
+
+async_engine = create_async_engine(
+    async_database_url(),
+    **_async_engine_kwargs(async_database_url()),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db():
+    """
+    Async dependency that provides a database session.
+    Closes the session after request completion.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
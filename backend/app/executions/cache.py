@@ -0,0 +1,108 @@
+"""
+Execution liveness check for child-record writes (observations, actions,
+artifacts), backed by a bounded LRU/TTL cache of terminal statuses.
+
+The database is authoritative: the status row is read FOR SHARE inside
+the write's own transaction, so complete_execution (whose UPDATE needs
+the row lock) waits for in-flight writes, and no write can land after
+the execution completed, whichever API worker handled the completion.
+
+Only terminal statuses are cached: they never change, so a hit safely
+rejects writes for a finished execution (e.g. late spool replays)
+without a query, even on workers that did not handle the completion.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.executions.models import Execution
+
+settings = get_settings()
+
+LIVE_STATUS = "started"
+
+
+class ExecutionCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, execution_id: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(execution_id)
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    del self._entries[execution_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(execution_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, execution_id: str, status: str) -> None:
+        with self._lock:
+            self._entries[execution_id] = (status, time.monotonic() + self.ttl)
+            self._entries.move_to_end(execution_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+execution_cache = ExecutionCache(
+    maxsize=settings.EXECUTION_CACHE_SIZE,
+    ttl=settings.EXECUTION_CACHE_TTL,
+)
+
+
+def _check(execution_id: str, status: str | None) -> None:
+    if status is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    if status != LIVE_STATUS:
+        raise HTTPException(status_code=409, detail=f"Execution is {status}")
+
+
+async def require_live_execution(db: AsyncSession, execution_id: str) -> None:
+    """
+    404 if the execution does not exist, 409 if it is no longer running.
+    Call it in the transaction that writes the child records.
+    """
+    await require_live_executions(db, {execution_id})
+
+
+async def require_live_executions(db: AsyncSession, execution_ids: set[str]) -> None:
+    """
+    Batch variant: the executions not known to be finished are checked
+    (and share-locked until commit) with a single query.
+    """
+    for execution_id in execution_ids:
+        status = execution_cache.get(execution_id)
+        if status is not None:
+            _check(execution_id, status)
+
+    # Sorted: concurrent batches take the row locks in the same order
+    rows = await db.execute(
+        select(Execution.id, Execution.status)
+        .where(Execution.id.in_(execution_ids))
+        .order_by(Execution.id)
+        .with_for_update(read=True)
+    )
+    statuses = dict(rows.all())
+    for execution_id, status in statuses.items():
+        if status != LIVE_STATUS:
+            execution_cache.put(execution_id, status)
+
+    for execution_id in execution_ids:
+        _check(execution_id, statuses.get(execution_id))
@@ -0,0 +1,187 @@
+"""
+Live execution event stream.
+
+The create endpoints publish every new action, observation and artifact
+(and the final execution status) to an in-process broker; GET
+/executions/{id}/stream delivers them as Server-Sent Events.
+
+The SSE `id` is a cursor on arrival time: the ingested_at watermark of
+the rows read from the database so far. A client resumes by
+reconnecting with `Last-Event-ID` (browsers do this automatically) or
+`?cursor=`: the stream first replays from the database, then follows
+live events.
+
+Timestamps are assigned before commit, so a row can become visible
+after rows stored later (a slow transaction, another API worker's
+clock). Every catch-up therefore re-reads the STREAM_OVERLAP window
+before the cursor and skips ids it already sent; a row committed more
+than STREAM_OVERLAP after its ingested_at can still be missed.
+
+Delivery is at-least-once: a resumed stream re-sends the overlap
+window, so clients deduplicate by event id.
+
+The broker only sees writes handled by this process. The stream catches
+up from the database every STREAM_POLL_INTERVAL (one indexed range
+query), so writes handled by other API workers still arrive, just
+later. A subscriber that falls too far behind is resynchronised the
+same way instead of buffering without bound.
+"""
+
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.executions.models import Execution
+from app.executions.timeline import STREAM_BATCH_SIZE, row_to_event, arrival_query
+
+settings = get_settings()
+
+def encode_cursor(ingested: datetime) -> str:
+    raw = ingested.isoformat().encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        return _utc(datetime.fromisoformat(raw))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps; they are UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+# ---------
+# Broker
+# ---------
+
+class Subscription:
+    def __init__(self, execution_id: str, maxsize: int):
+        self.execution_id = execution_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+class EventBroker:
+    """
+    Fan-out of events to the streams of one execution. Must be used from
+    the event loop (publish is called by the async create endpoints).
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, execution_id: str) -> Subscription:
+        sub = Subscription(execution_id, self.queue_size)
+        self._subscribers.setdefault(execution_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.execution_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.execution_id]
+
+    def publish(self, execution_id: str, event: dict) -> None:
+        for sub in self._subscribers.get(execution_id, ()):
+            if sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.overflowed = True
+
+
+event_broker = EventBroker(queue_size=settings.STREAM_QUEUE_SIZE)
+
+
+# ---------
+# SSE stream
+# ---------
+
+def _sse(event: dict, cursor: str | None = None) -> bytes:
+    head = f"id: {cursor}\n" if cursor else ""
+    return f"{head}event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+def status_event(execution_id: str, status: str) -> dict:
+    return {"type": "execution", "id": execution_id, "status": status}
+
+
+async def stream_execution_events(execution_id: str, cursor: datetime | None) -> AsyncIterator[bytes]:
+    """
+    Replay from `cursor` (or the beginning), then follow live events
+    until the execution finishes. Owns its sessions, like stream_timeline.
+    """
+    loop = asyncio.get_running_loop()
+    overlap = timedelta(seconds=settings.STREAM_OVERLAP)
+    # Ids sent, with their arrival time (live events: when they were
+    # received, which is no earlier), kept while inside the overlap window
+    sent: dict[str, datetime] = {}
+    sub = event_broker.subscribe(execution_id)
+    try:
+        while True:
+            fresh = 0
+            since = cursor - overlap if cursor is not None else None
+            async with AsyncSessionLocal() as db:
+                result = await db.stream(
+                    arrival_query(execution_id, since).execution_options(yield_per=STREAM_BATCH_SIZE)
+                )
+                async for row in result:
+                    ingested = _utc(row.ingested)
+                    if cursor is None or ingested > cursor:
+                        cursor = ingested
+                    if row.id in sent:
+                        continue
+                    sent[row.id] = ingested
+                    fresh += 1
+                    yield _sse(row_to_event(row), encode_cursor(cursor))
+                status = await db.scalar(select(Execution.status).where(Execution.id == execution_id))
+
+            if status != "started":
+                yield _sse(status_event(execution_id, status))
+                return
+            if not fresh:
+                yield b": keep-alive\n\n"
+            if cursor is not None:
+                horizon = cursor - overlap
+                sent = {event_id: at for event_id, at in sent.items() if at >= horizon}
+
+            # Follow live events until the next catch-up is due
+            deadline = loop.time() + settings.STREAM_POLL_INTERVAL
+            while not sub.overflowed:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if event["type"] == "execution":
+                    # Final catch-up (writes from other workers), then the status
+                    break
+                if event["id"] in sent:
+                    continue
+                sent[event["id"]] = datetime.now(timezone.utc)
+                # Live events do not move the cursor: rows stored before
+                # them may not be visible yet
+                yield _sse(event, encode_cursor(cursor) if cursor is not None else None)
+
+            if sub.overflowed:
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.overflowed = False
+    finally:
+        event_broker.unsubscribe(sub)
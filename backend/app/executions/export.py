@@ -0,0 +1,282 @@
+"""
+Streamed execution export bundle (tar).
+
+Generated incrementally as the response body: no temp file, bounded
+memory. Layout under execution-<id>/:
+
+    execution.json
+    actions/000000.ndjson ...        metadata rows, EXPORT_ROWS_PER_FILE each
+    observations/000000.ndjson ...
+    artifacts/000000.ndjson ...
+    frames/<observation id><ext>     stored frame files
+    files/<artifact id><ext>         stored artifact files
+    verification.json                checksum results (written last)
+
+Checksums are verified while the bytes are streamed:
+- keyframe/delta observations: the segments are replayed in sequence
+  order and each reconstructed frame is hashed (the checksum is over raw
+  pixels);
+- PNG observations and artifact files: SHA-256 of the file contents
+  (for PNGs this only matches legacy rows; see app.integrity.sweep).
+
+Tar headers carry the size up front, so a failed check cannot abort the
+member already being sent; failures are listed in verification.json.
+Objects are read through the same store as the frame endpoint (local
+storage or the s3:// bucket); objects that are missing or unreadable are
+listed there too. Local files are resolved with the same confinement
+as the frame endpoint (STORAGE_LOCAL_ROOT): a storage_uri pointing
+anywhere else is never read and is listed as "rejected".
+
+Files are read in CHUNK_SIZE pieces through one reused buffer, off the
+event loop; hashing on the fly rules out sendfile.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import tarfile
+import time
+from pathlib import PurePosixPath
+from typing import AsyncIterator, BinaryIO
+from urllib.parse import urlparse
+
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+from ui_formats.frames import Frame, FrameDecodeError, apply_segment
+from ui_formats.hashing import CHUNK_SIZE, sha256_buffer
+
+from app.db.session import AsyncSessionLocal
+from app.actions.models import Action
+from app.artifacts.models import DERIVED_ARTIFACT_TYPES, Artifact
+from app.executions.models import Execution
+from app.observations.framecodec import BlobOutsideStorage, open_blob
+from app.observations.models import Observation
+from app.storage.s3 import StorageError
+
+EXPORT_ROWS_PER_FILE = 10_000
+BLOCK = 512
+
+
+# ---------
+# Tar framing
+# ---------
+
+def _header(name: str, size: int, mtime: float | None = None) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = int(mtime if mtime is not None else time.time())
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % BLOCK)
+
+
+def _member(name: str, data: bytes) -> bytes:
+    return _header(name, len(data)) + data + _padding(len(data))
+
+
+def _jsonable(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _row(obj, columns) -> dict:
+    return {c: _jsonable(getattr(obj, attr)) for attr, c in columns}
+
+
+def _columns(model) -> list[tuple[str, str]]:
+    # (attribute, exported name): metadata_-style attributes keep their column name
+    return [(attr.key, attr.columns[0].name) for attr in model.__mapper__.column_attrs]
+
+
+# ---------
+# Files
+# ---------
+
+def _read_into(f, buf: bytearray) -> int:
+    return f.readinto(buf)
+
+
+async def _file_member(name: str, f: BinaryIO, size: int, mtime: float | None, digest) -> AsyncIterator[bytes]:
+    """
+    Stream `size` bytes of the open file `f` as a tar member (closing it),
+    feeding `digest`. A file that shrank is zero-padded (its checksum
+    will not match).
+    """
+    yield _header(name, size, mtime)
+    buf = bytearray(min(CHUNK_SIZE, max(size, 1)))
+    view = memoryview(buf)
+    remaining = size
+    with f:
+        while remaining:
+            n = await asyncio.to_thread(_read_into, f, buf)
+            if not n:
+                break
+            n = min(n, remaining)
+            digest.update(view[:n])
+            yield bytes(view[:n])
+            remaining -= n
+    if remaining:
+        yield b"\0" * remaining
+    yield _padding(size)
+
+
+def _open_blob(uri: str) -> tuple[BinaryIO, str, int, float | None] | None:
+    """
+    (file, suffix, size, mtime) of a stored blob, None if it is not
+    readable here. BlobOutsideStorage for paths outside STORAGE_LOCAL_ROOT,
+    StorageError if the object store fails. Blocking: call through
+    asyncio.to_thread.
+    """
+    try:
+        f, size, mtime = open_blob(uri)
+    except BlobOutsideStorage:
+        raise
+    except FrameDecodeError:
+        return None
+    return f, "".join(PurePosixPath(urlparse(uri).path).suffixes), size, mtime
+
+
+# ---------
+# Bundle
+# ---------
+
+class _Verification:
+    def __init__(self):
+        self.counts = {
+            "verified": 0, "mismatch": 0, "missing": 0, "unverifiable": 0, "not_stored": 0, "rejected": 0,
+        }
+        self.failures: list[dict] = []
+
+    def record(self, status: str, kind: str, obj_id: str, detail: str | None = None) -> None:
+        self.counts[status] += 1
+        if status in ("mismatch", "missing", "unverifiable", "rejected"):
+            self.failures.append({"type": kind, "id": obj_id, "status": status, "detail": detail})
+
+
+async def _metadata(db, model, query, root: str, folder: str) -> AsyncIterator[bytes]:
+    columns = _columns(model)
+    result = await db.stream_scalars(query.execution_options(yield_per=EXPORT_ROWS_PER_FILE))
+    part = 0
+    async for rows in result.partitions():
+        data = "".join(json.dumps(_row(r, columns)) + "\n" for r in rows).encode()
+        yield _member(f"{root}/{folder}/{part:06d}.ndjson", data)
+        part += 1
+
+
+async def _observation_frames(db, execution_id: str, root: str, check: _Verification) -> AsyncIterator[bytes]:
+    query = (
+        select(Observation)
+        .where(Observation.execution_id == execution_id)
+        .order_by(Observation.sequence, Observation.captured_at)
+    )
+    frame: Frame | None = None
+    expected_sequence = None
+    result = await db.stream_scalars(query.execution_options(yield_per=1000))
+    async for obs in result:
+        try:
+            located = await asyncio.to_thread(_open_blob, obs.storage_uri)
+        except BlobOutsideStorage as e:
+            located = None
+            check.record("rejected", "observation", obs.id, str(e))
+        except StorageError as e:
+            located = None
+            check.record("unverifiable", "observation", obs.id, str(e))
+        else:
+            if located is None:
+                check.record("missing", "observation", obs.id, obs.storage_uri)
+        if located is None:
+            frame = None
+            continue
+        f, suffix, size, mtime = located
+        name = f"{root}/frames/{obs.id}{suffix}"
+
+        if obs.encoding == "png":
+            digest = hashlib.sha256()
+            async for chunk in _file_member(name, f, size, mtime, digest):
+                yield chunk
+            if digest.hexdigest() == obs.checksum:
+                check.record("verified", "observation", obs.id)
+            else:
+                # Only legacy rows hash the PNG file; newer ones hash the decoded pixels
+                check.record("unverifiable", "observation", obs.id, "checksum is over decoded pixels")
+            continue
+
+        # Segments are small (compressed): read whole, replay, hash the frame
+        with f:
+            blob = await asyncio.to_thread(f.read)
+        yield _header(name, len(blob), mtime) + blob + _padding(len(blob))
+        try:
+            if obs.encoding == "delta" and (frame is None or obs.sequence != expected_sequence):
+                raise FrameDecodeError("previous segment of the chain is not in the export")
+            frame = await asyncio.to_thread(apply_segment, None if obs.encoding == "keyframe" else frame, blob)
+            expected_sequence = (obs.sequence or 0) + 1
+            ok = await asyncio.to_thread(sha256_buffer, frame.data) == obs.checksum
+            check.record("verified" if ok else "mismatch", "observation", obs.id)
+        except FrameDecodeError as e:
+            frame = None
+            check.record("unverifiable", "observation", obs.id, str(e))
+
+
+async def _artifact_files(db, execution_id: str, root: str, check: _Verification) -> AsyncIterator[bytes]:
+    query = select(Artifact).where(Artifact.execution_id == execution_id).order_by(Artifact.created_at)
+    result = await db.stream_scalars(query.execution_options(yield_per=1000))
+    async for artifact in result:
+        if artifact.artifact_type in DERIVED_ARTIFACT_TYPES:
+            check.record("not_stored", "artifact", artifact.id)
+            continue
+        try:
+            located = await asyncio.to_thread(_open_blob, artifact.storage_uri)
+        except BlobOutsideStorage as e:
+            check.record("rejected", "artifact", artifact.id, str(e))
+            continue
+        except StorageError as e:
+            check.record("unverifiable", "artifact", artifact.id, str(e))
+            continue
+        if located is None:
+            check.record("missing", "artifact", artifact.id, artifact.storage_uri)
+            continue
+        f, suffix, size, mtime = located
+        digest = hashlib.sha256()
+        async for chunk in _file_member(f"{root}/files/{artifact.id}{suffix}", f, size, mtime, digest):
+            yield chunk
+        check.record("verified" if digest.hexdigest() == artifact.checksum else "mismatch", "artifact", artifact.id)
+
+
+async def stream_export(execution_id: str) -> AsyncIterator[bytes]:
+    """
+    Yields the tar stream. Owns its session, like stream_timeline.
+    """
+    root = f"execution-{execution_id}"
+    check = _Verification()
+
+    async with AsyncSessionLocal() as db:
+        execution = await db.get(Execution, execution_id)
+        yield _member(f"{root}/execution.json", json.dumps(_row(execution, _columns(Execution)), indent=2).encode())
+
+        for model, query, folder in (
+            (Action, select(Action).options(undefer(Action.trace)).where(Action.execution_id == execution_id)
+             .order_by(Action.occurred_at), "actions"),
+            (Observation, select(Observation).where(Observation.execution_id == execution_id)
+             .order_by(Observation.captured_at), "observations"),
+            (Artifact, select(Artifact).where(Artifact.execution_id == execution_id)
+             .order_by(Artifact.created_at), "artifacts"),
+        ):
+            async for chunk in _metadata(db, model, query, root, folder):
+                yield chunk
+
+        async for chunk in _observation_frames(db, execution_id, root, check):
+            yield chunk
+        async for chunk in _artifact_files(db, execution_id, root, check):
+            yield chunk
+
+    report = {"execution_id": execution_id, **check.counts, "failures": check.failures}
+    yield _member(f"{root}/verification.json", json.dumps(report, indent=2).encode())
+    # End of archive
+    yield b"\0" * (2 * BLOCK)
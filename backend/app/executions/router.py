@@ -1,14 +1,20 @@
 from datetime import datetime
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.audit.writer import audit_writer
 from app.executions.models import Execution
+from app.executions.cache import execution_cache
+from app.executions.export import stream_export
+from app.executions.events import decode_cursor, event_broker, status_event, stream_execution_events
+from app.executions.timeline import stream_timeline
 
-router = APIRouter()
+router = APIRouter(prefix="/executions")
 
 
 # ---------
@@ -36,9 +42,9 @@ class ExecutionResponse(BaseModel):
     response_model=ExecutionResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def start_execution(
+async def start_execution(
     payload: ExecutionStartRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     execution = Execution(
         id=str(uuid4()),
@@ -48,9 +54,10 @@ def start_execution(
     )
 
     db.add(execution)
-    db.commit()
-    db.refresh(execution)
+    await db.commit()
+    await db.refresh(execution)
 
+    audit_writer.emit("execution_started", "execution", execution.id)
     return execution
 
 
@@ -58,21 +65,25 @@ def start_execution(
     "/{execution_id}/complete",
     response_model=ExecutionResponse,
 )
-def complete_execution(
+async def complete_execution(
     execution_id: str,
     success: bool,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    execution = db.get(Execution, execution_id)
+    execution = await db.get(Execution, execution_id)
     if not execution:
         raise HTTPException(status_code=404, detail="Execution not found")
 
     execution.status = "completed" if success else "failed"
     execution.finished_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(execution)
+    await db.commit()
+    await db.refresh(execution)
 
+    # Terminal statuses are final: later writes are rejected without a query
+    execution_cache.put(execution.id, execution.status)
+    audit_writer.emit(f"execution_{execution.status}", "execution", execution.id)
+    event_broker.publish(execution.id, status_event(execution.id, execution.status))
     return execution
 
 
@@ -80,12 +91,87 @@ def complete_execution(
     "/{execution_id}",
     response_model=ExecutionResponse,
 )
-def get_execution(
+async def get_execution(
     execution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    execution = db.get(Execution, execution_id)
+    execution = await db.get(Execution, execution_id)
     if not execution:
         raise HTTPException(status_code=404, detail="Execution not found")
 
     return execution
+
+
+@router.get(
+    "/{execution_id}/timeline",
+    response_class=StreamingResponse,
+)
+async def get_execution_timeline(
+    execution_id: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Actions, observations and artifacts interleaved in time order,
+    streamed as NDJSON (one event per line).
+    """
+    execution = await db.get(Execution, execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    return StreamingResponse(
+        stream_timeline(execution_id),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get(
+    "/{execution_id}/stream",
+    response_class=StreamingResponse,
+)
+async def stream_execution(
+    execution_id: str,
+    cursor: str | None = None,
+    last_event_id: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Server-Sent Events: the execution's timeline events stored since
+    `cursor` (or Last-Event-ID, or from the start), then new ones as they
+    are recorded, ending with an `execution` event carrying the final
+    status. At-least-once: a resumed stream may repeat events, so
+    deduplicate by id.
+    """
+    execution = await db.get(Execution, execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    resume = cursor or last_event_id
+    return StreamingResponse(
+        stream_execution_events(execution_id, decode_cursor(resume) if resume else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{execution_id}/export",
+    response_class=StreamingResponse,
+)
+async def export_execution(
+    execution_id: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Tar bundle of the execution's metadata rows and stored frames and
+    artifacts, generated while it is sent; checksum results are in its
+    verification.json.
+    """
+    execution = await db.get(Execution, execution_id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    return StreamingResponse(
+        stream_export(execution_id),
+        media_type="application/x-tar",
+        headers={"Content-Disposition": f'attachment; filename="execution-{execution_id}.tar"'},
+    )
@@ -0,0 +1,140 @@
+"""
+Execution timeline: actions, observations and artifacts of one execution,
+interleaved in time order.
+
+One UNION ALL query ordered by (at, id). Every branch has an
+(execution_id, time, id) index, so each is an index-ordered range scan
+and Postgres k-way merges them (Merge Append) instead of sorting.
+Events with the same timestamp are ordered by id alone, not by kind.
+Rows are streamed from a server-side cursor and emitted as NDJSON, so
+memory stays flat regardless of run length.
+
+arrival_query() is the same union in arrival (ingested_at) order, for
+the live stream's catch-up; artifacts have no client timestamp, so their
+created_at is their arrival time.
+"""
+
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import literal, null, select, union_all
+
+from app.db.session import AsyncSessionLocal
+from app.actions.models import Action
+from app.artifacts.models import Artifact
+from app.observations.models import Observation
+
+STREAM_BATCH_SIZE = 500
+
+
+def _timeline_union(execution_id: str):
+    actions = select(
+        literal("action").label("kind"),
+        Action.id.label("id"),
+        Action.occurred_at.label("at"),
+        Action.action_type.label("action_type"),
+        Action.parameters.label("parameters"),
+        null().label("artifact_type"),
+        null().label("storage_uri"),
+        null().label("checksum"),
+        Action.ingested_at.label("ingested"),
+    ).where(Action.execution_id == execution_id)
+
+    observations = select(
+        literal("observation").label("kind"),
+        Observation.id,
+        Observation.captured_at,
+        null(),
+        null(),
+        null(),
+        Observation.storage_uri,
+        Observation.checksum,
+        Observation.ingested_at,
+    ).where(Observation.execution_id == execution_id)
+
+    artifacts = select(
+        literal("artifact").label("kind"),
+        Artifact.id,
+        Artifact.created_at,
+        null(),
+        null(),
+        Artifact.artifact_type,
+        Artifact.storage_uri,
+        Artifact.checksum,
+        Artifact.created_at,
+    ).where(Artifact.execution_id == execution_id)
+
+    return union_all(actions, observations, artifacts).subquery()
+
+
+def timeline_query(execution_id: str):
+    """
+    Timeline rows in (at, id) order.
+    """
+    merged = _timeline_union(execution_id)
+    return select(merged).order_by(merged.c.at, merged.c.id)
+
+
+def arrival_query(execution_id: str, since: datetime | None = None):
+    """
+    Timeline rows in (ingested, id) order; with `since`, only the rows
+    stored at or after it.
+    """
+    merged = _timeline_union(execution_id)
+    query = select(merged)
+    if since is not None:
+        query = query.where(merged.c.ingested >= literal(since, merged.c.ingested.type))
+    return query.order_by(merged.c.ingested, merged.c.id)
+
+
+def timeline_event(
+    kind: str,
+    id: str,
+    at: datetime,
+    action_type: str | None = None,
+    parameters: str | None = None,
+    artifact_type: str | None = None,
+    storage_uri: str | None = None,
+    checksum: str | None = None,
+) -> dict:
+    """
+    One timeline event; also the payload of live stream events, so both
+    have the same shape.
+    """
+    event = {
+        "type": kind,
+        "id": id,
+        "at": at.isoformat() if isinstance(at, datetime) else at,
+    }
+    if kind == "action":
+        event["action_type"] = action_type
+        event["parameters"] = parameters
+    else:
+        if kind == "artifact":
+            event["artifact_type"] = artifact_type
+        event["storage_uri"] = storage_uri
+        event["checksum"] = checksum
+    return event
+
+
+def row_to_event(row) -> dict:
+    """
+    Timeline event of a timeline_query() / arrival_query() row.
+    """
+    return timeline_event(
+        row.kind, row.id, row.at, row.action_type, row.parameters, row.artifact_type, row.storage_uri, row.checksum
+    )
+
+
+async def stream_timeline(execution_id: str) -> AsyncIterator[bytes]:
+    """
+    Yields NDJSON lines. Owns its session: the request-scoped one may be
+    closed before a streaming body finishes.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            timeline_query(execution_id).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield json.dumps(row_to_event(row)).encode() + b"\n"
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class IntegrityWatermark(Base):
+    """
+    Progress of the integrity sweep (app.integrity.sweep) over one table.
+
+    One row per target type. The sweep keeps its position here instead
+    of marking every verified row, so the evidence tables stay immutable.
+    """
+
+    __tablename__ = "integrity_watermarks"
+
+    target_type: Mapped[str] = mapped_column(
+        String(32),
+        primary_key=True,
+        doc="observation | artifact",
+    )
+
+    verified_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Rows up to (verified_at, verified_id) have been verified once",
+    )
+
+    verified_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=False),
+        nullable=True,
+    )
+
+    recheck_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Position of the current recheck pass (NULL: next pass starts at the oldest row)",
+    )
+
+    recheck_id: Mapped[str | None] = mapped_column(
+        UUID(as_uuid=False),
+        nullable=True,
+    )
+
+    last_run_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
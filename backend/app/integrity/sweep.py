@@ -0,0 +1,458 @@
+"""
+Incremental integrity verification of stored observations and artifacts.
+
+Observations and artifacts are immutable and carry a checksum; this job
+re-reads the stored objects and checks them:
+
+- artifacts: SHA-256 of the object;
+- keyframe/delta observations: the chain is replayed (ui_formats.frames)
+  and every reconstructed frame is hashed (the checksum is over raw pixels);
+- png observations: SHA-256 of the file. Only rows written before the
+  executor switched to pixel checksums can match; the others are counted
+  as unverifiable (there is no PNG decoder on the API side).
+
+Each run covers, per table, in (stored time, id) keyset order: the
+time the backend stored the row (observations.ingested_at,
+artifacts.created_at), not the executor's capture time, so rows replayed
+late from an executor spool still land after the watermark.
+
+- new rows: everything after the table's watermark (integrity_watermarks)
+  stored more than INTEGRITY_SETTLE_SECONDS ago. The timestamp is taken
+  before the row commits; the settle time covers that lag;
+- a slice of the recheck pass: a second cursor walks from the oldest row
+  up to the watermark, advanced in proportion to the time since the last
+  run, so every row is re-verified once per INTEGRITY_RECHECK_DAYS
+  whatever the schedule.
+
+Objects are hashed in a process pool; each worker throttles its reads to
+its share of INTEGRITY_MAX_BYTES_PER_SEC. Positions are saved after every
+page, so an interrupted run resumes where it stopped; a storage error
+other than "not found" aborts the run rather than skipping rows. Any
+other error while checking one object marks it unverifiable.
+Mismatches and missing objects are written as integrity_check_failed
+audit events.
+
+Run from cron / a scheduler, e.g. hourly:
+
+    python -m app.integrity.sweep [--workers N] [--limit N]
+"""
+
+import argparse
+import hashlib
+import multiprocessing as mp
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session
+from ui_formats.frames import FrameDecodeError, apply_segment
+from ui_formats.hashing import CHUNK_SIZE, sha256_buffer
+
+from app.config import get_settings
+from app.db.session import SessionLocal
+from app.artifacts.models import DERIVED_ARTIFACT_TYPES, Artifact
+from app.audit.writer import audit_writer
+from app.integrity.models import IntegrityWatermark
+from app.observations.framecodec import BlobNotFound, open_blob
+from app.observations.models import Observation
+from app.storage.s3 import StorageError
+
+settings = get_settings()
+
+STATUSES = ("verified", "mismatch", "missing", "unverifiable", "not_stored")
+# Statuses written as audit events
+FAILURES = ("mismatch", "missing")
+FILES_PER_TASK = 32
+PAGES_IN_FLIGHT = 2
+
+Position = tuple[datetime, str]
+Result = tuple[str, str, str | None]  # (id, status, detail)
+
+
+# ---------
+# Worker side
+# ---------
+
+class Throttle:
+    """
+    Token bucket over bytes read by one process, with one second of burst.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._allowance = rate
+        self._last = time.monotonic()
+
+    def consume(self, n: int) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate) - n
+        self._last = now
+        if self._allowance < 0:
+            time.sleep(-self._allowance / self.rate)
+
+
+_throttle = Throttle(0)
+
+
+def _init_worker(rate: float) -> None:
+    global _throttle
+    _throttle = Throttle(rate)
+
+
+class _Missing(Exception):
+    pass
+
+
+class _Unreadable(Exception):
+    pass
+
+
+def _open(uri: str):
+    try:
+        f, _, _ = open_blob(uri)
+    except BlobNotFound as e:
+        raise _Missing(uri) from e
+    except FrameDecodeError as e:
+        raise _Unreadable(str(e)) from e
+    return f
+
+
+def _read(uri: str, sink: Callable) -> None:
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    with _open(uri) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            _throttle.consume(n)
+            sink(view[:n])
+
+
+def _unexpected(e: Exception) -> str:
+    # One bad object must not stop the run; storage outages still do
+    return f"unexpected error: {type(e).__name__}: {e}"
+
+
+def verify_files(items: list[tuple[str, str, str]], pixel_checksums: bool = False) -> list[Result]:
+    """
+    items: (id, storage_uri, checksum). With pixel_checksums, a file hash
+    that does not match is inconclusive rather than a mismatch.
+    """
+    results = []
+    for obj_id, uri, checksum in items:
+        digest = hashlib.sha256()
+        try:
+            _read(uri, digest.update)
+        except _Missing:
+            results.append((obj_id, "missing", uri))
+            continue
+        except _Unreadable as e:
+            results.append((obj_id, "unverifiable", str(e)))
+            continue
+        except StorageError:
+            raise
+        except Exception as e:
+            results.append((obj_id, "unverifiable", _unexpected(e)))
+            continue
+
+        if digest.hexdigest() == checksum:
+            results.append((obj_id, "verified", None))
+        elif pixel_checksums:
+            results.append((obj_id, "unverifiable", "checksum is over decoded pixels"))
+        else:
+            results.append((obj_id, "mismatch", None))
+    return results
+
+
+def verify_chain(segments: list[tuple[str, str, str, str, int]], targets: set[str]) -> list[Result]:
+    """
+    segments: (id, storage_uri, checksum, encoding, sequence) of one chain
+    in sequence order, from its keyframe. Only `targets` are reported;
+    the other segments are read to rebuild the frames.
+    """
+    results = []
+    frame = None
+    broken = None if segments and segments[0][3] == "keyframe" else "keyframe row is missing"
+    expected = segments[0][4] if segments else None
+
+    for obj_id, uri, checksum, encoding, sequence in segments:
+        if broken is None and sequence != expected:
+            broken = f"segment {expected} row is missing"
+        expected = sequence + 1
+        if broken is not None:
+            if obj_id in targets:
+                results.append((obj_id, "unverifiable", broken))
+            continue
+
+        data = bytearray()
+        detail = None
+        try:
+            _read(uri, data.extend)
+            frame = apply_segment(frame if encoding == "delta" else None, data)
+            status = "verified" if sha256_buffer(frame.data) == checksum else "mismatch"
+        except _Missing:
+            status, detail = "missing", uri
+        except _Unreadable as e:
+            status, detail = "unverifiable", str(e)
+        except FrameDecodeError as e:
+            status, detail = "mismatch", str(e)
+        except StorageError:
+            raise
+        except Exception as e:
+            status, detail = "unverifiable", _unexpected(e)
+
+        if status != "verified":
+            # Later frames are built on this one
+            broken = f"segment {sequence} failed verification"
+        if obj_id in targets:
+            results.append((obj_id, status, detail))
+    return results
+
+
+# ---------
+# Scan side
+# ---------
+
+def _naive(moment: datetime) -> datetime:
+    # Timestamps are UTC throughout (datetime.utcnow); drivers differ on tzinfo
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _done(results: list[Result]) -> Future:
+    future = Future()
+    future.set_result(results)
+    return future
+
+
+class _Scan(ABC):
+    """
+    Keyset pages of one table and the verification tasks for them.
+    """
+
+    def __init__(self, kind: str, model, at, columns: tuple):
+        self.kind = kind
+        self.model = model
+        self.at = at
+        self.columns = columns
+
+    def page(self, db: Session, after: Position | None, until: datetime, limit: int) -> list:
+        model, at = self.model, self.at
+        query = (
+            select(model.id, at.label("at"), *self.columns)
+            .where(at <= until)
+            .order_by(at, model.id)
+            .limit(limit)
+        )
+        if after is not None:
+            # Typed binds: SQLite stores UUIDs without dashes
+            query = query.where(
+                tuple_(at, model.id) > tuple_(literal(after[0], at.type), literal(after[1], model.id.type))
+            )
+        return db.execute(query).all()
+
+    @abstractmethod
+    def submit(self, db: Session, pool: ProcessPoolExecutor, rows: list) -> list[Future]:
+        ...
+
+
+class _ArtifactScan(_Scan):
+    def __init__(self):
+        super().__init__(
+            "artifact", Artifact, Artifact.created_at,
+            (Artifact.execution_id, Artifact.storage_uri, Artifact.checksum, Artifact.artifact_type),
+        )
+
+    def submit(self, db, pool, rows):
+        derived = [(r.id, "not_stored", None) for r in rows if r.artifact_type in DERIVED_ARTIFACT_TYPES]
+        files = [(r.id, r.storage_uri, r.checksum) for r in rows if r.artifact_type not in DERIVED_ARTIFACT_TYPES]
+        futures = [_done(derived)]
+        for i in range(0, len(files), FILES_PER_TASK):
+            futures.append(pool.submit(verify_files, files[i:i + FILES_PER_TASK]))
+        return futures
+
+
+class _ObservationScan(_Scan):
+    def __init__(self):
+        super().__init__(
+            "observation", Observation, Observation.ingested_at,
+            (Observation.execution_id, Observation.storage_uri, Observation.checksum, Observation.encoding,
+             Observation.sequence, Observation.keyframe_sequence),
+        )
+
+    def submit(self, db, pool, rows):
+        files, chains = [], {}
+        for r in rows:
+            if r.encoding in ("keyframe", "delta") and r.sequence is not None and r.keyframe_sequence is not None:
+                targets, last = chains.get((r.execution_id, r.keyframe_sequence), (set(), -1))
+                targets.add(r.id)
+                chains[(r.execution_id, r.keyframe_sequence)] = (targets, max(last, r.sequence))
+            else:
+                files.append((r.id, r.storage_uri, r.checksum))
+
+        futures = [
+            pool.submit(verify_files, files[i:i + FILES_PER_TASK], True)
+            for i in range(0, len(files), FILES_PER_TASK)
+        ]
+        if not chains:
+            return futures
+
+        # Whole chains up to their last page row: earlier segments may predate the page
+        segments = {key: [] for key in chains}
+        query = (
+            select(Observation.id, Observation.storage_uri, Observation.checksum, Observation.encoding,
+                   Observation.sequence, Observation.execution_id, Observation.keyframe_sequence)
+            .where(tuple_(Observation.execution_id, Observation.keyframe_sequence).in_(list(chains)))
+            .order_by(Observation.execution_id, Observation.sequence)
+        )
+        for s in db.execute(query):
+            key = (s.execution_id, s.keyframe_sequence)
+            if s.sequence <= chains[key][1]:
+                segments[key].append((s.id, s.storage_uri, s.checksum, s.encoding, s.sequence))
+        for key, (targets, _) in chains.items():
+            futures.append(pool.submit(verify_chain, segments[key], targets))
+        return futures
+
+
+SCANS = (_ObservationScan(), _ArtifactScan())
+
+
+def _record(kind: str, results: list[Result], rows: dict, counts: dict) -> None:
+    for obj_id, status, detail in results:
+        counts[status] += 1
+        if status in FAILURES:
+            row = rows[obj_id]
+            audit_writer.emit(
+                "integrity_check_failed",
+                kind,
+                obj_id,
+                actor_type="system",
+                actor_id="integrity_sweep",
+                metadata={
+                    "status": status,
+                    "detail": detail,
+                    "execution_id": row.execution_id,
+                    "storage_uri": row.storage_uri,
+                },
+            )
+
+
+def _sweep_range(
+    db: Session,
+    pool: ProcessPoolExecutor,
+    scan: _Scan,
+    after: Position | None,
+    until: datetime,
+    limit: int | None,
+    counts: dict,
+    save: Callable[[Position], None],
+) -> tuple[int, bool]:
+    """
+    Verify rows after `after` up to `until`, PAGES_IN_FLIGHT pages at a
+    time; save(position) once a page is fully recorded. Returns (rows,
+    whether the range was exhausted).
+    """
+    in_flight = deque()
+    position = after
+    done = 0
+    exhausted = False
+    while True:
+        size = settings.INTEGRITY_BATCH_SIZE if limit is None else min(settings.INTEGRITY_BATCH_SIZE, limit - done)
+        if not exhausted and size > 0 and len(in_flight) < PAGES_IN_FLIGHT:
+            rows = scan.page(db, position, until, size)
+            if rows:
+                position = (rows[-1].at, rows[-1].id)
+                in_flight.append((scan.submit(db, pool, rows), {r.id: r for r in rows}, position))
+                done += len(rows)
+            exhausted = len(rows) < size
+            if not exhausted and len(in_flight) < PAGES_IN_FLIGHT:
+                continue  # keep the pool fed while the oldest page runs
+        if not in_flight:
+            break
+
+        futures, page_rows, reached = in_flight.popleft()
+        for future in futures:
+            _record(scan.kind, future.result(), page_rows, counts)
+        save(reached)
+
+    return done, exhausted
+
+
+def sweep_table(db: Session, pool: ProcessPoolExecutor, scan: _Scan, now: datetime, limit: int | None = None) -> dict:
+    state = db.get(IntegrityWatermark, scan.kind)
+    if state is None:
+        state = IntegrityWatermark(target_type=scan.kind)
+        db.add(state)
+    counts = dict.fromkeys(STATUSES, 0)
+
+    # New rows
+    def save_verified(position: Position) -> None:
+        state.verified_at, state.verified_id = position
+        db.commit()
+
+    after = (state.verified_at, state.verified_id) if state.verified_at is not None else None
+    until = now - timedelta(seconds=settings.INTEGRITY_SETTLE_SECONDS)
+    done, _ = _sweep_range(db, pool, scan, after, until, limit, counts, save_verified)
+
+    # Slice of the recheck pass
+    recheck = settings.INTEGRITY_RECHECK_DAYS
+    remaining = None if limit is None else limit - done
+    if recheck > 0 and state.last_run_at is not None and state.verified_at is not None and remaining != 0:
+        verified_at = _naive(state.verified_at)
+        oldest = _naive(db.scalar(select(func.min(scan.at))))
+        start = _naive(state.recheck_at) if state.recheck_at is not None else oldest
+        elapsed = (now - _naive(state.last_run_at)) / timedelta(days=recheck)
+        end = min(start + (verified_at - oldest) * elapsed, verified_at)
+
+        def save_recheck(position: Position) -> None:
+            state.recheck_at, state.recheck_id = position
+            db.commit()
+
+        after = (state.recheck_at, state.recheck_id) if state.recheck_at is not None else None
+        _, exhausted = _sweep_range(db, pool, scan, after, end, remaining, counts, save_recheck)
+        if exhausted and end >= verified_at:
+            # Pass complete; the next one starts at the oldest row
+            state.recheck_at = state.recheck_id = None
+
+    state.last_run_at = now
+    db.commit()
+    return counts
+
+
+def run_sweep(workers: int | None = None, limit: int | None = None) -> dict[str, dict]:
+    """
+    One incremental run over every table; returns status counts per table.
+    """
+    workers = workers or settings.INTEGRITY_WORKERS or os.cpu_count() or 1
+    rate = settings.INTEGRITY_MAX_BYTES_PER_SEC / workers
+    now = datetime.utcnow()
+    results = {}
+
+    with ProcessPoolExecutor(
+        workers, mp_context=mp.get_context("spawn"), initializer=_init_worker, initargs=(rate,),
+    ) as pool, SessionLocal() as db:
+        for scan in SCANS:
+            counts = sweep_table(db, pool, scan, now, limit)
+            audit_writer.emit(
+                "integrity_sweep_completed", "integrity", scan.kind,
+                actor_type="system", actor_id="integrity_sweep", metadata=counts,
+            )
+            results[scan.kind] = counts
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify stored observations and artifacts against their checksums.")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: INTEGRITY_WORKERS)")
+    parser.add_argument("--limit", type=int, default=None, help="at most this many rows per table")
+    args = parser.parse_args()
+
+    for kind, counts in run_sweep(workers=args.workers, limit=args.limit).items():
+        print(f"{kind}s: " + ", ".join(f"{status} {n}" for status, n in counts.items()))
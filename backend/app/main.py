@@ -1,5 +1,8 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 # Routers (will be implemented incrementally)
 from app.executions.router import router as executions_router
@@ -7,6 +10,56 @@ from app.observations.router import router as observations_router
 from app.actions.router import router as actions_router
 from app.artifacts.router import router as artifacts_router
 from app.audit.router import router as audit_router
+from app.storage.router import router as storage_router
+from app.audit.writer import audit_writer
+from app.executions.cache import execution_cache
+from app.executions.events import event_broker
+from app.observations.similarity import similarity_index
+from app.db.session import async_engine, engine
+from app.metrics.instrumentation import MetricsMiddleware, instrument_engine
+from app.metrics.registry import REGISTRY
+
+# Instrumentation (module level: engines are process-wide singletons)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+REGISTRY.gauge(
+    "audit_queue_depth", "Audit events queued but not yet written."
+).set_function(lambda: audit_writer.queue_depth)
+REGISTRY.counter(
+    "audit_events_written_total", "Audit events written."
+).set_function(lambda: audit_writer.written)
+REGISTRY.gauge(
+    "audit_events_spooled", "Audit events spooled to disk after failed writes, awaiting replay."
+).set_function(lambda: audit_writer.spooled)
+REGISTRY.counter(
+    "audit_events_dropped_total", "Audit events lost: failed writes that could not be spooled either."
+).set_function(lambda: audit_writer.dropped)
+cache_lookups = REGISTRY.counter(
+    "execution_cache_lookups_total", "Execution status cache lookups.", ("result",)
+)
+cache_lookups.set_function(lambda: execution_cache.hits, result="hit")
+cache_lookups.set_function(lambda: execution_cache.misses, result="miss")
+REGISTRY.gauge(
+    "execution_cache_entries", "Executions held in the status cache."
+).set_function(lambda: len(execution_cache))
+REGISTRY.gauge(
+    "similarity_index_entries", "Observations held in the perceptual-hash index."
+).set_function(lambda: len(similarity_index))
+REGISTRY.gauge(
+    "execution_stream_subscribers", "Open live execution event streams."
+).set_function(lambda: len(event_broker))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await audit_writer.start()
+    await similarity_index.start()
+    try:
+        yield
+    finally:
+        await similarity_index.stop()
+        # Guaranteed flush of queued audit events
+        await audit_writer.stop()
 
 
 def create_app() -> FastAPI:
@@ -14,6 +67,7 @@ def create_app() -> FastAPI:
         title="UI Execution Backend",
         description="Control plane for UI-level execution, observations, and proof artifacts.",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # CORS (open for now, restrict later)
@@ -25,17 +79,37 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Outermost: latency includes every other middleware
+    app.add_middleware(MetricsMiddleware)
+
     # Health check — FIRST reality endpoint
     @app.get("/health", tags=["system"])
     def health_check():
-        return {"status": "ok"}
+        return {
+            # Lost audit events need an operator: alert on "degraded"
+            "status": "ok" if audit_writer.healthy else "degraded",
+            "audit_queue_depth": audit_writer.queue_depth,
+            "audit_events_spooled": audit_writer.spooled,
+            "audit_events_dropped": audit_writer.dropped,
+            "execution_cache": {
+                "size": len(execution_cache),
+                "hits": execution_cache.hits,
+                "misses": execution_cache.misses,
+            },
+        }
+
+    # Prometheus scrape endpoint
+    @app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
     # Register routers (even if empty for now)
-    app.include_router(executions_router, prefix="/executions", tags=["executions"])
-    app.include_router(observations_router, prefix="/observations", tags=["observations"])
-    app.include_router(actions_router, prefix="/actions", tags=["actions"])
-    app.include_router(artifacts_router, prefix="/artifacts", tags=["artifacts"])
-    app.include_router(audit_router, prefix="/audit", tags=["audit"])
+    app.include_router(executions_router, tags=["executions"])
+    app.include_router(observations_router, tags=["observations"])
+    app.include_router(actions_router, tags=["actions"])
+    app.include_router(artifacts_router, tags=["artifacts"])
+    app.include_router(audit_router, tags=["audit"])
+    app.include_router(storage_router, tags=["storage"])
 
     return app
 
@@ -0,0 +1,131 @@
+"""
+Request and database instrumentation.
+
+- MetricsMiddleware (pure ASGI, safe with streaming responses) records
+  per-route latency, status codes and in-flight requests, and the number
+  of SQL statements each request issued (catches N+1 patterns).
+- instrument_engine() hooks SQLAlchemy cursor events to time every
+  statement and exposes pool usage at scrape time (catches starvation).
+
+Routes are labelled by their path template (/actions/{execution_id}),
+never the raw path, so label cardinality stays bounded.
+"""
+
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics.registry import REGISTRY
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+DB_STATEMENT_LATENCY = REGISTRY.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time.", ("engine", "operation")
+)
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request.", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_POOL = REGISTRY.gauge(
+    "db_pool_connections", "Connection pool usage.", ("engine", "state")
+)
+
+# Statement counter of the request currently being served (None outside requests)
+_request_queries: ContextVar[list | None] = ContextVar("request_queries", default=None)
+
+
+# ---------
+# HTTP
+# ---------
+
+def _route_template(scope) -> str:
+    # Routers declare their own prefix, so the matched route's path_format
+    # is already the full template
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    return path_format if path_format is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            _request_queries.reset(token)
+
+            method = scope["method"]
+            route = _route_template(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            DB_QUERIES_PER_REQUEST.observe(queries[0], method=method, route=route)
+
+
+# ---------
+# Database
+# ---------
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Attach timing hooks to a sync Engine (use async_engine.sync_engine
+    for async engines) and register its pool gauges.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context rather than the connection, so a
+        # statement that fails (no after_cursor_execute) leaves nothing behind
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_STATEMENT_LATENCY.observe(elapsed, engine=name, operation=operation)
+
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+    pool = engine.pool
+    for state, fn in (
+        ("checked_out", getattr(pool, "checkedout", None)),
+        ("checked_in", getattr(pool, "checkedin", None)),
+        ("overflow", getattr(pool, "overflow", None)),
+        ("size", getattr(pool, "size", None)),
+    ):
+        if callable(fn):
+            DB_POOL.set_function(fn, engine=name, state=state)
@@ -0,0 +1,102 @@
+"""
+Reading keyframe + delta observation frames from storage.
+
+The segment format and its decoder live in ui_formats.frames, shared with
+the executor's encoder; this module only locates and reads the blobs.
+
+storage_uri is client-supplied, so local paths are confined: they must
+resolve (symlinks included) inside STORAGE_LOCAL_ROOT, and local reads
+are disabled while it is unset. Objects in s3:// storage are read from
+the configured bucket only.
+"""
+
+import os
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import unquote, urlparse
+
+from ui_formats.frames import FrameDecodeError
+
+from app.config import get_settings
+from app.storage.s3 import StorageError, get_object_store
+
+settings = get_settings()
+
+
+class BlobOutsideStorage(FrameDecodeError):
+    pass
+
+
+class BlobNotFound(FrameDecodeError):
+    pass
+
+
+def blob_path(uri: str) -> Path:
+    """
+    Resolved local path of a stored blob (local path or file:// URI);
+    BlobOutsideStorage if it is not under STORAGE_LOCAL_ROOT.
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        path = Path(unquote(parsed.path))
+    elif parsed.scheme and len(parsed.scheme) > 1:
+        raise FrameDecodeError(f"Unsupported storage URI: {uri}")
+    else:
+        path = Path(uri)
+
+    if not settings.STORAGE_LOCAL_ROOT:
+        raise BlobOutsideStorage(f"Local storage is not configured: {uri}")
+    root = Path(settings.STORAGE_LOCAL_ROOT).resolve()
+    # Relative paths are relative to the root; resolve() follows symlinks
+    # and "..", so the check is on the real location
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise BlobOutsideStorage(f"Outside local storage: {uri}")
+    return resolved
+
+
+def open_blob(uri: str) -> tuple[BinaryIO, int, float | None]:
+    """
+    Open a stored blob (local or s3://) for streaming: (file, size,
+    mtime); close the file. BlobNotFound if it does not exist, another
+    FrameDecodeError if the URI cannot be read from here, StorageError if
+    the object store fails. Blocking.
+    """
+    if uri.startswith("s3://"):
+        store = get_object_store()
+        try:
+            key = store.key_from_uri(uri)
+        except StorageError as e:
+            raise FrameDecodeError(str(e)) from e
+        try:
+            r = store.open(key)
+        except StorageError as e:
+            if e.status == 404:
+                raise BlobNotFound(f"Not found: {uri}") from e
+            raise
+        modified = r.headers.get("Last-Modified")
+        mtime = parsedate_to_datetime(modified).timestamp() if modified else None
+        return r, int(r.headers.get("Content-Length", 0)), mtime
+
+    path = blob_path(uri)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError as e:
+        raise BlobNotFound(f"Not found: {uri}") from e
+    except OSError as e:
+        raise FrameDecodeError(f"Cannot read {uri}: {e.strerror}") from e
+    # Measured on the open file: the size is the one of the bytes read
+    st = os.fstat(f.fileno())
+    return f, st.st_size, st.st_mtime
+
+
+def read_blob(uri: str) -> bytes:
+    try:
+        f, _, _ = open_blob(uri)
+        with f:
+            return f.read()
+    except StorageError as e:
+        raise FrameDecodeError(f"Cannot read {uri}: {e}") from e
+    except OSError as e:
+        raise FrameDecodeError(f"Cannot read {uri}: {e.strerror}") from e
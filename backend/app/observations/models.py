@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, String, Text, Index
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -16,6 +16,8 @@ class Observation(Base):
     """
 
     __tablename__ = "observations"
+    # Range-partitioned by time on Postgres (see app.db.partitions)
+    __table_args__ = {"postgresql_partition_by": "RANGE (captured_at)"}
 
     id: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
@@ -42,11 +44,56 @@ class Observation(Base):
         doc="Hash of the frame for immutability verification",
     )
 
+    # Frame storage: a standalone PNG, or a segment of a keyframe + delta chain
+    encoding: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        default="png",
+        server_default="png",
+        doc="png | keyframe | delta",
+    )
+
+    sequence: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Frame number within the execution (keyframe/delta only)",
+    )
+
+    keyframe_sequence: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Sequence of the keyframe this frame's delta chain starts at",
+    )
+
+    phash: Mapped[int | None] = mapped_column(
+        BigInteger,
+        nullable=True,
+        doc="64-bit perceptual hash (dHash) of the frame, stored signed",
+    )
+
+    # Part of the primary key: partitioned tables require the partition key in it
     captured_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    ingested_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=datetime.utcnow,
+        server_default=func.now(),
         nullable=False,
+        doc="When the backend stored the row (captured_at is client time)",
     )
 
 
-Index("ix_observations_execution_time", Observation.execution_id, Observation.captured_at)
+# Timeline order within an execution: (at, id) is the timeline sort key
+Index("ix_observations_execution_time", Observation.execution_id, Observation.captured_at, Observation.id)
+# Arrival order within an execution (live stream catch-up)
+Index("ix_observations_execution_ingested", Observation.execution_id, Observation.ingested_at, Observation.id)
+Index("ix_observations_execution_sequence", Observation.execution_id, Observation.sequence)
+# captured_at ranges across executions (similarity index loads)
+Index("ix_observations_time_id", Observation.captured_at, Observation.id)
+# Keyset scans in storage order (integrity sweep)
+Index("ix_observations_ingested_id", Observation.ingested_at, Observation.id)
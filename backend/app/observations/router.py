@@ -1,13 +1,29 @@
+import asyncio
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
+from typing import Literal
+from uuid import uuid4
 
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ui_formats.frames import FrameDecodeError, decode_chain
+
+from app.config import get_settings
+from app.db.session import get_async_db
+from app.audit.writer import audit_writer
 from app.observations.models import Observation
-from app.executions.models import Execution
+from app.observations.framecodec import read_blob
+from app.observations.similarity import IndexNotReady, phash_from_db, phash_to_db, similarity_index
+from app.executions.cache import require_live_execution, require_live_executions
+from app.executions.events import event_broker
+from app.executions.timeline import timeline_event
+
+settings = get_settings()
+
+router = APIRouter(prefix="/observations")
 
-router = APIRouter()
+PHASH_PATTERN = r"^[0-9a-fA-F]{16}$"
 
 
 # ---------
@@ -19,6 +35,10 @@ class ObservationCreate(BaseModel):
     storage_uri: HttpUrl | str
     checksum: str
     captured_at: datetime | None = None
+    encoding: Literal["png", "keyframe", "delta"] = "png"
+    sequence: int | None = None
+    keyframe_sequence: int | None = None
+    phash: str | None = Field(default=None, pattern=PHASH_PATTERN)
 
 
 class ObservationResponse(BaseModel):
@@ -27,6 +47,23 @@ class ObservationResponse(BaseModel):
     storage_uri: str
     checksum: str
     captured_at: datetime
+    encoding: str
+    sequence: int | None
+    keyframe_sequence: int | None
+    phash: str | None = None
+
+    @field_validator("phash", mode="before")
+    @classmethod
+    def _phash_hex(cls, value):
+        return phash_from_db(value) if isinstance(value, int) else value
+
+
+class ObservationBatchResponse(BaseModel):
+    ids: list[str]
+
+
+class SimilarObservation(ObservationResponse):
+    distance: int
 
 
 # ---------
@@ -38,40 +75,213 @@ class ObservationResponse(BaseModel):
     response_model=ObservationResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_observation(
+async def create_observation(
     payload: ObservationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Ensure execution exists
-    execution = db.get(Execution, payload.execution_id)
-    if not execution:
-        raise HTTPException(status_code=404, detail="Execution not found")
+    # Ensure execution exists and is still running
+    await require_live_execution(db, payload.execution_id)
 
     obs = Observation(
         execution_id=payload.execution_id,
         storage_uri=str(payload.storage_uri),
         checksum=payload.checksum,
         captured_at=payload.captured_at or datetime.utcnow(),
+        encoding=payload.encoding,
+        sequence=payload.sequence,
+        keyframe_sequence=payload.keyframe_sequence,
+        phash=phash_to_db(payload.phash) if payload.phash else None,
     )
 
     db.add(obs)
-    db.commit()
-    db.refresh(obs)
+    await db.commit()
+    await db.refresh(obs)
+
+    if obs.phash is not None:
+        similarity_index.add(obs.phash, obs.id)
+
+    audit_writer.emit("observation_recorded", "observation", obs.id, metadata={"execution_id": obs.execution_id})
+    event_broker.publish(obs.execution_id, timeline_event(
+        "observation", obs.id, obs.captured_at, storage_uri=obs.storage_uri, checksum=obs.checksum
+    ))
     return obs
 
 
+@router.post(
+    "/batch",
+    response_model=ObservationBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_observations_batch(
+    payload: list[ObservationCreate],
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not payload:
+        return ObservationBatchResponse(ids=[])
+
+    # Ensure every referenced execution exists and is running (one query at most)
+    await require_live_executions(db, {p.execution_id for p in payload})
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid4()),
+            "execution_id": p.execution_id,
+            "storage_uri": str(p.storage_uri),
+            "checksum": p.checksum,
+            "captured_at": p.captured_at or now,
+            "encoding": p.encoding,
+            "sequence": p.sequence,
+            "keyframe_sequence": p.keyframe_sequence,
+            "phash": phash_to_db(p.phash) if p.phash else None,
+            "ingested_at": now,
+        }
+        for p in payload
+    ]
+
+    # Single multi-row INSERT, single commit
+    await db.execute(insert(Observation), rows)
+    await db.commit()
+
+    for r in rows:
+        if r["phash"] is not None:
+            similarity_index.add(r["phash"], r["id"])
+        audit_writer.emit("observation_recorded", "observation", r["id"], metadata={"execution_id": r["execution_id"]})
+        event_broker.publish(r["execution_id"], timeline_event(
+            "observation", r["id"], r["captured_at"], storage_uri=r["storage_uri"], checksum=r["checksum"]
+        ))
+    return ObservationBatchResponse(ids=[r["id"] for r in rows])
+
+
+# Registered before /{execution_id}, which would otherwise match "similar"
+@router.get(
+    "/similar",
+    response_model=list[SimilarObservation],
+)
+async def find_similar_observations(
+    phash: str | None = Query(default=None, pattern=PHASH_PATTERN),
+    observation_id: str | None = None,
+    max_distance: int = Query(default=8, ge=0, le=settings.SIMILARITY_MAX_DISTANCE),
+    limit: int = Query(default=50, ge=1, le=1000),
+    execution_id: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Observations whose perceptual hash is within `max_distance` bits of
+    `phash` (or of observation `observation_id`'s hash), nearest first.
+    """
+    if (phash is None) == (observation_id is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of phash, observation_id")
+
+    if observation_id is not None:
+        value = await db.scalar(select(Observation.phash).where(Observation.id == observation_id))
+        if value is None:
+            raise HTTPException(status_code=404, detail="Observation not found or has no perceptual hash")
+    else:
+        value = phash_to_db(phash)
+
+    try:
+        hits = await similarity_index.search(value, max_distance)
+    except IndexNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    if observation_id is not None:
+        hits = [h for h in hits if h[2] != observation_id]
+    if not hits:
+        return []
+
+    distances = {item: d for d, _, item in hits}
+    # Fetch in id chunks; the execution filter is applied by the database
+    found = []
+    ids = [item for _, _, item in hits]
+    for i in range(0, len(ids), 1000):
+        query = select(Observation).where(Observation.id.in_(ids[i:i + 1000]))
+        if execution_id is not None:
+            query = query.where(Observation.execution_id == execution_id)
+        found.extend((await db.scalars(query)).all())
+        if execution_id is None and len(found) >= limit:
+            break
+
+    found.sort(key=lambda o: (distances[o.id], o.captured_at))
+    return [
+        SimilarObservation(
+            **ObservationResponse.model_validate(o, from_attributes=True).model_dump(),
+            distance=distances[o.id],
+        )
+        for o in found[:limit]
+    ]
+
+
 @router.get(
     "/{execution_id}",
     response_model=list[ObservationResponse],
 )
-def list_observations_for_execution(
+async def list_observations_for_execution(
     execution_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    rows = (
-        db.query(Observation)
-        .filter(Observation.execution_id == execution_id)
+    rows = await db.scalars(
+        select(Observation)
+        .where(Observation.execution_id == execution_id)
         .order_by(Observation.captured_at.asc())
-        .all()
     )
-    return rows
+    return rows.all()
+
+
+@router.get("/frame/{observation_id}")
+async def get_observation_frame(
+    observation_id: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Frame of one observation. PNG observations are returned as stored;
+    keyframe/delta observations are reconstructed from their chain and
+    returned as raw BGRA pixels (geometry in the X-Frame-* headers).
+    """
+    obs = await db.scalar(select(Observation).where(Observation.id == observation_id))
+    if not obs:
+        raise HTTPException(status_code=404, detail="Observation not found")
+
+    if obs.encoding == "png":
+        try:
+            content = await asyncio.to_thread(read_blob, obs.storage_uri)
+        except FrameDecodeError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return Response(content=content, media_type="image/png")
+
+    if obs.sequence is None or obs.keyframe_sequence is None:
+        raise HTTPException(status_code=409, detail="Observation has no frame chain")
+
+    chain = (await db.scalars(
+        select(Observation)
+        .where(
+            Observation.execution_id == obs.execution_id,
+            Observation.sequence >= obs.keyframe_sequence,
+            Observation.sequence <= obs.sequence,
+        )
+        .order_by(Observation.sequence.asc())
+    )).all()
+
+    # One segment per sequence number, starting at the keyframe, no gaps
+    segments = {o.sequence: o for o in chain}
+    expected = range(obs.keyframe_sequence, obs.sequence + 1)
+    if any(s not in segments for s in expected) or segments[obs.keyframe_sequence].encoding != "keyframe":
+        raise HTTPException(status_code=409, detail="Frame chain is incomplete")
+    uris = [segments[s].storage_uri for s in expected]
+
+    def decode():
+        return decode_chain([read_blob(uri) for uri in uris], checksum=obs.checksum)
+
+    try:
+        frame = await asyncio.to_thread(decode)
+    except FrameDecodeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return Response(
+        content=bytes(frame.data),
+        media_type="application/octet-stream",
+        headers={
+            "X-Frame-Width": str(frame.width),
+            "X-Frame-Height": str(frame.height),
+            "X-Frame-Channels": str(frame.channels),
+        },
+    )
@@ -0,0 +1,251 @@
+"""
+Perceptual-hash similarity index over observations.
+
+The executor computes a 64-bit dHash for every frame it records (it
+already has the pixels in memory) and sends it as `phash`; it is stored
+on the observation. This module keeps an in-memory BK-tree over all
+stored hashes and answers "observations within Hamming distance k of
+this hash" by visiting only the subtrees the triangle inequality allows,
+instead of scanning every frame.
+
+The index is maintained by a background task (start()/stop() from the
+app lifespan), never on the request path:
+
+- it is built at startup; until then searches raise IndexNotReady (the
+  endpoint answers 503);
+- rows created through this process are added immediately;
+- every SIMILARITY_REFRESH_INTERVAL, rows stored since the last load (by
+  any process) are pulled in by captured_at;
+- every SIMILARITY_REBUILD_INTERVAL a new tree is built beside the live
+  one and swapped in, which also picks up rows that arrived with an old
+  captured_at (spool replays).
+
+Memory is bounded: only the newest SIMILARITY_MAX_ENTRIES observations
+are indexed (a rebuild is brought forward once additions overshoot the
+bound), and ids are held as 16-byte UUIDs. Each process that enables
+SIMILARITY_INDEX holds its own copy, so in a multi-worker deployment
+enable it on the workers (or the dedicated instance) that serve
+/observations/similar only.
+
+Hashes are stored as signed BIGINT; the API uses 16-digit hex.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.observations.models import Observation
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LOAD_BATCH_SIZE = 10_000
+
+
+class IndexNotReady(Exception):
+    pass
+
+
+def phash_to_db(value: str) -> int:
+    n = int(value, 16)
+    return n - (1 << 64) if n >= 1 << 63 else n
+
+
+def phash_from_db(value: int) -> str:
+    return f"{value & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+class BKTree:
+    """
+    BK-tree over 64-bit hashes under Hamming distance. Each node holds
+    every item stored with exactly its hash, so re-adding one is a no-op.
+    """
+
+    def __init__(self):
+        # node: [hash, item (or a set of items sharing the hash),
+        #        children {distance: node} (None until the first child)]
+        self._root: list | None = None
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        if self._root is None:
+            self._root = [value, item, None]
+            self.size += 1
+            return
+        node = self._root
+        while True:
+            d = (node[0] ^ value).bit_count()
+            if d == 0:
+                items = node[1]
+                if isinstance(items, set):
+                    if item not in items:
+                        items.add(item)
+                        self.size += 1
+                elif items != item:
+                    node[1] = {items, item}
+                    self.size += 1
+                return
+            if node[2] is None:
+                node[2] = {}
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, item, None]
+                self.size += 1
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int, object]]:
+        """(distance, hash, item) of every entry within `max_distance`."""
+        if self._root is None:
+            return []
+        out = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = (node[0] ^ value).bit_count()
+            if d <= max_distance:
+                items = node[1]
+                out.extend((d, node[0], item) for item in (items if isinstance(items, set) else (items,)))
+            if node[2] is not None:
+                lo, hi = d - max_distance, d + max_distance
+                for cd, child in node[2].items():
+                    if lo <= cd <= hi:
+                        stack.append(child)
+        return out
+
+
+class SimilarityIndex:
+    def __init__(self, refresh_interval: float, rebuild_interval: float, max_entries: int, enabled: bool = True):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        self._watermark: datetime | None = None
+        self._built_at = 0.0
+        self._ready = False
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return self._tree.size
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def add(self, phash: int, observation_id: str) -> None:
+        if not self._ready:
+            return  # the initial build loads it
+        with self._lock:
+            self._tree.add(phash & 0xFFFFFFFFFFFFFFFF, UUID(observation_id).bytes)
+
+    # ---------
+    # Lifecycle
+    # ---------
+
+    async def start(self) -> None:
+        if self.enabled:
+            self._task = asyncio.create_task(self._run(), name="similarity-index")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if (
+                    not self._ready
+                    or time.monotonic() - self._built_at >= self.rebuild_interval
+                    or self._tree.size > self.max_entries
+                ):
+                    await self._rebuild()
+                else:
+                    self._watermark = await self._load(self._tree, self._watermark)
+            except Exception:
+                logger.exception("similarity index refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    # ---------
+    # Loading
+    # ---------
+
+    def _add_rows(self, tree: BKTree, rows) -> None:
+        with self._lock:
+            for observation_id, phash, _ in rows:
+                tree.add(phash & 0xFFFFFFFFFFFFFFFF, UUID(observation_id).bytes)
+
+    async def _load(self, tree: BKTree, since: datetime | None, limit: int | None = None) -> datetime | None:
+        query = select(Observation.id, Observation.phash, Observation.captured_at).where(
+            Observation.phash.is_not(None)
+        )
+        if since is not None:
+            # >=: rows sharing the watermark timestamp are re-added (no-op)
+            query = query.where(Observation.captured_at >= since)
+        if limit is not None:
+            # Newest first, so the bound keeps the most recent observations
+            query = query.order_by(Observation.captured_at.desc()).limit(limit)
+
+        watermark = since
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=LOAD_BATCH_SIZE))
+            async for rows in result.partitions():
+                # Tree inserts are CPU-bound: keep them off the event loop
+                await asyncio.to_thread(self._add_rows, tree, rows)
+                latest = max(r[2] for r in rows)
+                if watermark is None or latest > watermark:
+                    watermark = latest
+        return watermark
+
+    async def _rebuild(self) -> None:
+        started = time.monotonic()
+        tree = BKTree()
+        # Rows added to the live tree meanwhile are covered by the load itself
+        watermark = await self._load(tree, None, limit=self.max_entries)
+        with self._lock:
+            self._tree = tree
+        self._watermark = watermark
+        self._built_at = time.monotonic()
+        self._ready = True
+        logger.info("similarity index built: %d entries in %.1fs", tree.size, self._built_at - started)
+
+    # ---------
+    # Queries
+    # ---------
+
+    async def search(self, phash: int, max_distance: int) -> list[tuple[int, str, str]]:
+        """(distance, hex hash, observation id), nearest first."""
+        if not self.enabled:
+            raise IndexNotReady("Similarity index is disabled on this instance")
+        if not self._ready:
+            raise IndexNotReady("Similarity index is still being built")
+
+        def run():
+            with self._lock:
+                return self._tree.search(phash & 0xFFFFFFFFFFFFFFFF, max_distance)
+
+        hits = await asyncio.to_thread(run)
+        hits.sort()
+        return [(d, f"{h:016x}", str(UUID(bytes=item))) for d, h, item in hits]
+
+
+similarity_index = SimilarityIndex(
+    refresh_interval=settings.SIMILARITY_REFRESH_INTERVAL,
+    rebuild_interval=settings.SIMILARITY_REBUILD_INTERVAL,
+    max_entries=settings.SIMILARITY_MAX_ENTRIES,
+    enabled=settings.SIMILARITY_INDEX,
+)
@@ -0,0 +1,227 @@
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+from app.storage.s3 import (
+    MAX_PARTS,
+    ObjectStore,
+    StorageError,
+    StorageNotConfigured,
+    checksum_header,
+    composite_checksum,
+    content_key,
+    get_object_store,
+    part_size_for,
+)
+
+router = APIRouter(prefix="/storage")
+settings = get_settings()
+
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
+MAX_OBJECT_SIZE = 5 << 40  # S3 limit: 5 TiB
+
+Sha256 = Annotated[str, Field(pattern=SHA256_PATTERN)]
+
+
+# ---------
+# Schemas
+# ---------
+
+class UploadRequest(BaseModel):
+    sha256: str = Field(pattern=SHA256_PATTERN, description="SHA-256 of the bytes to upload (hex)")
+    size: int = Field(ge=0, le=MAX_OBJECT_SIZE)
+    content_type: str = "application/octet-stream"
+
+
+class PartUrl(BaseModel):
+    part_number: int
+    url: str
+    headers: dict[str, str] = {}
+
+
+class UploadTicket(BaseModel):
+    storage_uri: str
+    # True: identical content is already stored, nothing to upload
+    exists: bool
+    # Single upload: PUT the bytes to `url` with exactly `headers`
+    url: str | None = None
+    headers: dict[str, str] = {}
+    # Multipart: hash bytes [(n - 1) * part_size, n * part_size) of each
+    # of part_count parts, POST the hashes to /storage/uploads/parts for
+    # the part URLs, PUT each part, then POST /storage/uploads/complete
+    upload_id: str | None = None
+    part_size: int | None = None
+    part_count: int | None = None
+
+
+class PartsRequest(BaseModel):
+    sha256: str = Field(pattern=SHA256_PATTERN)
+    upload_id: str
+    part_sha256: list[Sha256] = Field(min_length=1, max_length=MAX_PARTS)
+
+
+class PartsTicket(BaseModel):
+    parts: list[PartUrl]
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(ge=1)
+    etag: str
+    sha256: str = Field(pattern=SHA256_PATTERN)
+
+
+class CompleteUploadRequest(BaseModel):
+    sha256: str = Field(pattern=SHA256_PATTERN)
+    size: int = Field(ge=0, le=MAX_OBJECT_SIZE)
+    upload_id: str
+    parts: list[CompletedPart] = Field(min_length=1)
+
+
+class UploadResponse(BaseModel):
+    storage_uri: str
+
+
+# ---------
+# Helpers
+# ---------
+
+def _store() -> ObjectStore:
+    try:
+        return get_object_store()
+    except StorageNotConfigured as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _storage_failure(e: StorageError) -> HTTPException:
+    # Client mistakes (unknown upload id, bad part list) vs store failures
+    if e.status in (400, 404):
+        return HTTPException(status_code=409, detail=str(e))
+    return HTTPException(status_code=502, detail=str(e))
+
+
+def _ticket(store: ObjectStore, payload: UploadRequest, key: str, upload_id: str | None) -> UploadTicket:
+    if upload_id is None:
+        headers = {"x-amz-checksum-sha256": checksum_header(payload.sha256), "content-type": payload.content_type}
+        return UploadTicket(
+            storage_uri=store.storage_uri(key),
+            exists=False,
+            url=store.presign("PUT", key, settings.STORAGE_PRESIGN_EXPIRY, headers=headers),
+            headers=headers,
+        )
+
+    part_size = part_size_for(payload.size, settings.STORAGE_PART_SIZE)
+    return UploadTicket(
+        storage_uri=store.storage_uri(key),
+        exists=False,
+        upload_id=upload_id,
+        part_size=part_size,
+        part_count=max(-(-payload.size // part_size), 1),
+    )
+
+
+# ---------
+# Endpoints
+# ---------
+
+@router.post(
+    "/uploads",
+    response_model=UploadTicket,
+)
+async def create_upload(payload: UploadRequest):
+    """
+    Where to upload content with this SHA-256. The key is derived from
+    the checksum, so content already stored is not uploaded again. An
+    object of the wrong size under the key is not that content: the
+    upload replaces it.
+    """
+    store = _store()
+    key = content_key(payload.sha256)
+
+    try:
+        existing = await asyncio.to_thread(store.head, key)
+        if existing == payload.size:
+            return UploadTicket(storage_uri=store.storage_uri(key), exists=True)
+
+        upload_id = None
+        if payload.size > settings.STORAGE_MULTIPART_THRESHOLD:
+            upload_id = await asyncio.to_thread(store.create_multipart, key, payload.content_type)
+    except StorageError as e:
+        raise _storage_failure(e)
+
+    return _ticket(store, payload, key, upload_id)
+
+
+@router.post(
+    "/uploads/parts",
+    response_model=PartsTicket,
+)
+async def sign_parts(payload: PartsRequest):
+    """
+    Part URLs of a multipart upload. Each URL signs its part's SHA-256,
+    so the store rejects a part whose bytes do not match.
+    """
+    store = _store()
+    key = content_key(payload.sha256)
+    expires = settings.STORAGE_PRESIGN_EXPIRY
+    parts = []
+    for n, part_sha256 in enumerate(payload.part_sha256, 1):
+        headers = {"x-amz-checksum-sha256": checksum_header(part_sha256)}
+        query = {"partNumber": str(n), "uploadId": payload.upload_id}
+        parts.append(PartUrl(part_number=n, url=store.presign("PUT", key, expires, query, headers), headers=headers))
+    return PartsTicket(parts=parts)
+
+
+@router.post(
+    "/uploads/complete",
+    response_model=UploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def complete_upload(payload: CompleteUploadRequest):
+    """
+    Assemble the parts. The store checked every part against its signed
+    SHA-256 and checks them again here; the composite checksum it returns
+    must be the one of those parts, and the object must have the declared
+    size (otherwise it is deleted: 409). Nothing is read back.
+
+    Idempotent: repeating a completed call (e.g. after a client timeout)
+    returns the stored object.
+    """
+    store = _store()
+    key = content_key(payload.sha256)
+    parts = [(p.part_number, p.etag, p.sha256.lower()) for p in payload.parts]
+    try:
+        try:
+            checksum = await asyncio.to_thread(store.complete_multipart, key, payload.upload_id, parts)
+        except StorageError as e:
+            # NoSuchUpload: completed (or aborted) already
+            if e.status != 404 or await asyncio.to_thread(store.head, key) != payload.size:
+                raise
+            return UploadResponse(storage_uri=store.storage_uri(key))
+
+        expected = composite_checksum([sha256 for _, _, sha256 in sorted(parts)])
+        size = await asyncio.to_thread(store.head, key)
+        if (checksum is not None and checksum != expected) or size != payload.size:
+            await asyncio.to_thread(store.delete, key)
+            raise HTTPException(
+                status_code=409,
+                detail=f"Stored object ({size} bytes, checksum {checksum}) does not match the upload "
+                       f"({payload.size} bytes, checksum {expected})",
+            )
+    except StorageError as e:
+        raise _storage_failure(e)
+    return UploadResponse(storage_uri=store.storage_uri(key))
+
+
+@router.delete(
+    "/uploads/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def abort_upload(upload_id: str, sha256: str = Query(pattern=SHA256_PATTERN)):
+    store = _store()
+    try:
+        await asyncio.to_thread(store.abort_multipart, content_key(sha256), upload_id)
+    except StorageError as e:
+        raise _storage_failure(e)
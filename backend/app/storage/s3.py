@@ -0,0 +1,301 @@
+"""
+Minimal S3-compatible object store client (AWS, MinIO, ...).
+
+Only what the upload path needs, on the standard library: AWS
+Signature V4 for presigned URLs and for the few control calls the API
+makes itself (HEAD, multipart create/complete/abort, streamed GET for
+verification, DELETE). Object bytes never pass through the API:
+executors PUT them to presigned URLs.
+
+Objects are content-addressed: the key is derived from the SHA-256 of
+the bytes (`sha256/ab/abcd...`), so identical content maps to one object
+and is uploaded once. Single-request uploads sign the
+x-amz-checksum-sha256 header, so the store rejects bytes that do not
+match the key. Multipart uploads are created with the SHA256 checksum
+algorithm and every part URL signs that part's checksum, so the store
+checks each part as it arrives; completing returns the composite
+checksum of the parts (composite_checksum()).
+
+Path-style addressing (`<endpoint>/<bucket>/<key>`), which MinIO needs.
+Calls are blocking; async callers use asyncio.to_thread.
+"""
+
+import base64
+import hashlib
+import hmac
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote, urlparse
+from xml.etree import ElementTree
+
+from app.config import get_settings
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+KEY_PREFIX = "sha256"
+
+# S3 multipart limits
+MIN_PART_SIZE = 5 << 20
+MAX_PARTS = 10_000
+
+
+class StorageError(Exception):
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class StorageNotConfigured(StorageError):
+    pass
+
+
+def content_key(sha256: str) -> str:
+    sha256 = sha256.lower()
+    return f"{KEY_PREFIX}/{sha256[:2]}/{sha256}"
+
+
+def checksum_header(sha256: str) -> str:
+    # x-amz-checksum-sha256 is the base64 digest, not hex
+    return base64.b64encode(bytes.fromhex(sha256)).decode()
+
+
+def composite_checksum(part_sha256: list[str]) -> str:
+    # S3 multipart checksum: SHA-256 of the concatenated part digests,
+    # base64, suffixed with the part count
+    digest = hashlib.sha256(b"".join(bytes.fromhex(h) for h in part_sha256)).digest()
+    return f"{base64.b64encode(digest).decode()}-{len(part_sha256)}"
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+class ObjectStore:
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        timeout: float = 30.0,
+    ):
+        self.endpoint = endpoint.rstrip("/")
+        self.host = urlparse(self.endpoint).netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.timeout = timeout
+
+    # -----------------------------
+    # URIS
+    # -----------------------------
+    def storage_uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def key_from_uri(self, uri: str) -> str:
+        parsed = urlparse(uri)
+        if parsed.scheme != "s3" or parsed.netloc != self.bucket:
+            raise StorageError(f"Not an object in bucket {self.bucket}: {uri}")
+        return parsed.path.lstrip("/")
+
+    def _path(self, key: str) -> str:
+        return f"/{_uri_encode(self.bucket)}/{_uri_encode(key, safe='-_.~/')}"
+
+    # -----------------------------
+    # SIGNATURE V4
+    # -----------------------------
+    def _scope(self, when: datetime) -> tuple[str, str]:
+        date = when.strftime("%Y%m%d")
+        return when.strftime("%Y%m%dT%H%M%SZ"), f"{date}/{self.region}/s3/aws4_request"
+
+    def _signature(self, when: datetime, scope: str, canonical_request: str) -> str:
+        amz_date = when.strftime("%Y%m%dT%H%M%SZ")
+        string_to_sign = "\n".join(
+            [ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+        )
+        key = _hmac(f"AWS4{self.secret_key}".encode(), when.strftime("%Y%m%d"))
+        for part in (self.region, "s3", "aws4_request"):
+            key = _hmac(key, part)
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _canonical(
+        method: str, path: str, query: dict[str, str], headers: dict[str, str], payload_hash: str,
+    ) -> tuple[str, str]:
+        canonical_query = "&".join(
+            f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(query.items())
+        )
+        names = sorted(headers)
+        canonical_headers = "".join(f"{n}:{headers[n].strip()}\n" for n in names)
+        signed_headers = ";".join(names)
+        request = "\n".join([method, path, canonical_query, canonical_headers, signed_headers, payload_hash])
+        return request, signed_headers
+
+    def presign(
+        self,
+        method: str,
+        key: str,
+        expires: int,
+        query: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        now: datetime | None = None,
+    ) -> str:
+        """
+        Presigned URL for one request. `headers` are signed: the client
+        must send them with exactly these values.
+        """
+        when = now or datetime.now(timezone.utc)
+        amz_date, scope = self._scope(when)
+        signed = {"host": self.host, **{k.lower(): v for k, v in (headers or {}).items()}}
+        params = {
+            **(query or {}),
+            "X-Amz-Algorithm": ALGORITHM,
+            "X-Amz-Credential": f"{self.access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": ";".join(sorted(signed)),
+        }
+        path = self._path(key)
+        request, _ = self._canonical(method, path, params, signed, UNSIGNED_PAYLOAD)
+        params["X-Amz-Signature"] = self._signature(when, scope, request)
+        return f"{self.endpoint}{path}?" + "&".join(
+            f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in params.items()
+        )
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        query: dict[str, str] | None = None,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ):
+        when = datetime.now(timezone.utc)
+        amz_date, scope = self._scope(when)
+        payload_hash = hashlib.sha256(body).hexdigest()
+        signed = {
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+            **{k.lower(): v for k, v in (headers or {}).items()},
+        }
+        path = self._path(key)
+        query = query or {}
+        request, signed_headers = self._canonical(method, path, query, signed, payload_hash)
+        signature = self._signature(when, scope, request)
+        signed["authorization"] = (
+            f"{ALGORITHM} Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        url = f"{self.endpoint}{path}"
+        if query:
+            url += "?" + "&".join(
+                f"{_uri_encode(k)}={_uri_encode(v)}" if v else _uri_encode(k) for k, v in sorted(query.items())
+            )
+        del signed["host"]
+        req = urllib.request.Request(url, data=body if method in ("POST", "PUT") else None, method=method,
+                                     headers=signed)
+        try:
+            return urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            detail = e.read(500).decode(errors="replace") if method != "HEAD" else ""
+            raise StorageError(f"{method} {key}: {e.code} {detail}".strip(), e.code) from e
+        except OSError as e:
+            raise StorageError(f"{method} {key}: {e}") from e
+
+    # -----------------------------
+    # OBJECTS
+    # -----------------------------
+    def head(self, key: str) -> int | None:
+        """
+        Size of the object, or None if it does not exist.
+        """
+        try:
+            with self._request("HEAD", key) as r:
+                return int(r.headers.get("Content-Length", 0))
+        except StorageError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def open(self, key: str):
+        """
+        Streamed GET: a file-like response (read/readinto); close it.
+        """
+        return self._request("GET", key)
+
+    def create_multipart(self, key: str, content_type: str) -> str:
+        """
+        Start a multipart upload whose parts must carry SHA256 checksums.
+        """
+        headers = {"content-type": content_type, "x-amz-checksum-algorithm": "SHA256"}
+        with self._request("POST", key, {"uploads": ""}, headers=headers) as r:
+            root = ElementTree.fromstring(r.read())
+        upload_id = next((el.text for el in root.iter() if el.tag.endswith("UploadId")), None)
+        if not upload_id:
+            raise StorageError(f"No UploadId in CreateMultipartUpload response for {key}")
+        return upload_id
+
+    def complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str, str]]) -> str | None:
+        """
+        parts: (part_number, etag, sha256 hex). Returns the object's
+        composite checksum as reported by the store (None if it has none).
+        """
+        body = "".join(
+            f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag>"
+            f"<ChecksumSHA256>{checksum_header(sha256)}</ChecksumSHA256></Part>"
+            for n, etag, sha256 in sorted(parts)
+        )
+        xml = f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode()
+        with self._request("POST", key, {"uploadId": upload_id}, xml, {"content-type": "application/xml"}) as r:
+            # Errors after the upload started are reported with a 200 status
+            root = ElementTree.fromstring(r.read())
+        if root.tag.endswith("Error"):
+            code = next((el.text for el in root if el.tag.endswith("Code")), "Error")
+            raise StorageError(f"CompleteMultipartUpload {key}: {code}", 400)
+        return next((el.text for el in root if el.tag.endswith("ChecksumSHA256")), None)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        try:
+            self._request("DELETE", key, {"uploadId": upload_id}).close()
+        except StorageError as e:
+            if e.status != 404:
+                raise
+
+    def delete(self, key: str) -> None:
+        try:
+            self._request("DELETE", key).close()
+        except StorageError as e:
+            if e.status != 404:
+                raise
+
+
+def part_size_for(size: int, preferred: int) -> int:
+    # Parts are at least 5 MiB, and at most MAX_PARTS of them
+    return max(preferred, MIN_PART_SIZE, -(-size // MAX_PARTS))
+
+
+@lru_cache
+def get_object_store() -> ObjectStore:
+    settings = get_settings()
+    missing = [
+        name for name in ("STORAGE_ENDPOINT", "STORAGE_BUCKET", "STORAGE_ACCESS_KEY", "STORAGE_SECRET_KEY")
+        if not getattr(settings, name)
+    ]
+    if missing:
+        raise StorageNotConfigured(f"Object storage is not configured ({', '.join(missing)} unset)")
+    return ObjectStore(
+        settings.STORAGE_ENDPOINT,
+        settings.STORAGE_BUCKET,
+        settings.STORAGE_ACCESS_KEY,
+        settings.STORAGE_SECRET_KEY,
+        settings.STORAGE_REGION or "us-east-1",
+    )
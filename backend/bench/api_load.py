@@ -0,0 +1,210 @@
+"""
+Backend load benchmark.
+
+Boots create_app() in-process (httpx ASGI transport, no network) against
+the given database, or targets a running server with --url, and drives
+the executor workload:
+
+    start execution -> N actions / M observations (single or batch)
+    -> K artifacts -> complete -> timeline read -> audit page read
+
+Reports p50/p95/p99 latency per operation and rows/s as JSON, so results
+can be diffed across releases.
+
+    cd backend
+    python -m bench.api_load --database-url sqlite:///./bench.db \\
+        --executions 50 --concurrency 8 --actions 200 --out results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples: dict[str, list[float]]) -> dict:
+    out = {}
+    for op, values in sorted(samples.items()):
+        values = sorted(values)
+        out[op] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+        }
+    return out
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Workload:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.rows = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def call(self, op: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        r = await self.client.request(method, url, **kwargs)
+        self.samples[op].append(time.perf_counter() - start)
+        self.requests += 1
+        if r.status_code >= 400:
+            self.errors += 1
+            raise RuntimeError(f"{op}: {r.status_code} {r.text[:200]}")
+        return r
+
+    async def post_many(self, op: str, path: str, items: list[dict]) -> None:
+        if self.args.batch_size > 1:
+            for i in range(0, len(items), self.args.batch_size):
+                chunk = items[i:i + self.args.batch_size]
+                await self.call(f"{op}_batch", "POST", f"{path}/batch", json=chunk)
+                self.rows += len(chunk)
+        else:
+            for item in items:
+                await self.call(op, "POST", path, json=item)
+                self.rows += 1
+
+    async def execution(self, n: int) -> None:
+        a = self.args
+        r = await self.call("start_execution", "POST", "/executions/start", json={"environment": f"bench-{n}"})
+        execution_id = r.json()["id"]
+        self.rows += 1
+
+        await self.post_many("create_action", "/actions", [
+            {"execution_id": execution_id, "action_type": "mouse_move", "parameters": f"{i},{i}"}
+            for i in range(a.actions)
+        ])
+        await self.post_many("create_observation", "/observations", [
+            {"execution_id": execution_id, "storage_uri": f"s3://bench/{execution_id}/{i}.png", "checksum": f"{i:064x}"}
+            for i in range(a.observations)
+        ])
+        await self.post_many("create_artifact", "/artifacts", [
+            {"execution_id": execution_id, "artifact_type": "pixel_delta",
+             "storage_uri": f"s3://bench/{execution_id}/delta-{i}", "checksum": f"{i:064x}"}
+            for i in range(a.artifacts)
+        ])
+
+        await self.call("complete_execution", "POST", f"/executions/{execution_id}/complete", params={"success": True})
+        await self.call("read_timeline", "GET", f"/executions/{execution_id}/timeline")
+        await self.call("read_audit_page", "GET", "/audit/events",
+                        params={"target_type": "execution", "target_id": execution_id, "limit": 100})
+
+    async def run(self) -> float:
+        queue: asyncio.Queue = asyncio.Queue()
+        for n in range(self.args.executions):
+            queue.put_nowait(n)
+
+        async def worker():
+            while True:
+                try:
+                    n = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self.execution(n)
+                except RuntimeError as e:
+                    print(e, file=sys.stderr)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        return time.perf_counter() - start
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        lifespan = None
+    else:
+        # Settings are read at import time: configure before importing the app
+        os.environ["DATABASE_URL"] = args.database_url
+        from app.db.init_db import init_db
+        from app.main import create_app
+
+        init_db()
+        app = create_app()
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    try:
+        workload = Workload(client, args)
+        wall = await workload.run()
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    return {
+        "benchmark": "api_load",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "target": args.url or args.database_url.split("@")[-1],
+        "config": {
+            "executions": args.executions,
+            "concurrency": args.concurrency,
+            "actions": args.actions,
+            "observations": args.observations,
+            "artifacts": args.artifacts,
+            "batch_size": args.batch_size,
+        },
+        "wall_s": round(wall, 3),
+        "requests": workload.requests,
+        "errors": workload.errors,
+        "rows": workload.rows,
+        "rows_per_s": round(workload.rows / wall, 1) if wall else None,
+        "requests_per_s": round(workload.requests / wall, 1) if wall else None,
+        "operations": summarize(workload.samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process app")
+    parser.add_argument("--executions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--actions", type=int, default=100)
+    parser.add_argument("--observations", type=int, default=20)
+    parser.add_argument("--artifacts", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=100, help="1 = single-row endpoints")
+    parser.add_argument("--out", help="write JSON results to this file (default: stdout)")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Display backends: where frames come from and where input goes.
+
+run() only talks to a backend, so the same execution can drive
+
+- LocalBackend  -- the real display (mss + pyautogui), one per host
+- XvfbBackend   -- a private headless X server, one per worker process
+- FakeBackend   -- an in-memory framebuffer, no display at all (tests,
+                   runner/backend benchmarks)
+
+Every backend exposes `sct`, an mss-compatible grabber (`monitors`,
+`grab(rect)` returning an object with `bgra`, `width`, `height`), so the
+capture helpers in capture.py work unchanged.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+from movetrace import MoveTrace
+
+# Cursor samples per second of an animated move (what a trace records)
+MOVE_SAMPLE_HZ = 60
+
+
+class Backend(ABC):
+    name = "abstract"
+    # Display string a separate capture process can open (ContinuousRecorder);
+    # None with out_of_process_capture=False means capture must stay in-process
+    display: str | None = None
+    out_of_process_capture = True
+
+    sct = None
+    # False: animated moves are interpolated without sleeping
+    realtime = True
+
+    @abstractmethod
+    def size(self) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def position(self) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def warp(self, x: int, y: int) -> None:
+        """Put the cursor at (x, y) immediately."""
+
+    def move_to(self, x: int, y: int, duration: float = 0.0, trace: MoveTrace | None = None) -> None:
+        """
+        Move linearly to (x, y) over `duration`, in MOVE_SAMPLE_HZ steps;
+        every cursor position (start included) is added to `trace`.
+        """
+        sx, sy = self.position()
+        if trace is not None:
+            trace.add(sx, sy)
+        steps = max(1, int(duration * MOVE_SAMPLE_HZ))
+        for i in range(1, steps + 1):
+            px = round(sx + (x - sx) * i / steps)
+            py = round(sy + (y - sy) * i / steps)
+            self.warp(px, py)
+            if trace is not None:
+                trace.add(px, py)
+            if self.realtime and i < steps:
+                time.sleep(duration / steps)
+
+    @abstractmethod
+    def click(self) -> None:
+        ...
+
+    @abstractmethod
+    def hotkey(self, *keys: str) -> None:
+        ...
+
+    def close(self) -> None:
+        if self.sct is not None:
+            self.sct.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------
+# REAL DISPLAYS
+# -----------------------------
+class LocalBackend(Backend):
+    """
+    The display this process runs on (DISPLAY, or the OS desktop).
+    """
+
+    name = "local"
+
+    def __init__(self):
+        # Imported here: pyautogui connects to the display on import
+        import pyautogui
+        from mss import mss
+
+        pyautogui.FAILSAFE = False
+        self._gui = pyautogui
+        self.display = os.environ.get("DISPLAY")
+        self.sct = mss()
+
+    def size(self) -> tuple[int, int]:
+        w, h = self._gui.size()
+        return int(w), int(h)
+
+    def position(self) -> tuple[int, int]:
+        x, y = self._gui.position()
+        return int(x), int(y)
+
+    def warp(self, x: int, y: int) -> None:
+        self._gui.moveTo(x, y, _pause=False)
+
+    def click(self) -> None:
+        self._gui.click()
+
+    def hotkey(self, *keys: str) -> None:
+        self._gui.hotkey(*keys)
+
+
+class XvfbBackend(LocalBackend):
+    """
+    Starts `Xvfb :<display_number>` and points this process at it.
+
+    pyautogui binds to $DISPLAY once per process, so use at most one
+    XvfbBackend per process (the runner gives each worker its own).
+    """
+
+    name = "xvfb"
+
+    def __init__(self, display_number: int, width: int = 1920, height: int = 1080, start_timeout: float = 10.0):
+        xvfb = shutil.which("Xvfb")
+        if xvfb is None:
+            raise RuntimeError("Xvfb is not installed")
+
+        self._proc = subprocess.Popen(
+            [xvfb, f":{display_number}", "-screen", "0", f"{width}x{height}x24", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        socket_path = Path(f"/tmp/.X11-unix/X{display_number}")
+        deadline = time.monotonic() + start_timeout
+        while not socket_path.exists():
+            if self._proc.poll() is not None or time.monotonic() > deadline:
+                self._proc.kill()
+                raise RuntimeError(f"Xvfb :{display_number} did not start")
+            time.sleep(0.05)
+
+        os.environ["DISPLAY"] = f":{display_number}"
+        try:
+            super().__init__()
+        except Exception:
+            self._proc.kill()
+            raise
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+
+# -----------------------------
+# IN-MEMORY
+# -----------------------------
+class FakeShot:
+    def __init__(self, pixels: np.ndarray):
+        self.height, self.width = pixels.shape[:2]
+        self.bgra = pixels.tobytes()
+
+
+class FakeScreen:
+    """
+    mss-compatible grabber over a BGRA numpy framebuffer.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.framebuffer = np.zeros((height, width, 4), dtype=np.uint8)
+        self.framebuffer[..., 3] = 255
+        mon = {"left": 0, "top": 0, "width": width, "height": height}
+        # Index 0 is the virtual screen, 1 the (only) monitor, as with mss
+        self.monitors = [dict(mon), dict(mon)]
+
+    def grab(self, rect: dict) -> FakeShot:
+        x, y = rect["left"], rect["top"]
+        return FakeShot(self.framebuffer[y:y + rect["height"], x:x + rect["width"]])
+
+    def close(self) -> None:
+        pass
+
+
+class FakeBackend(Backend):
+    """
+    Deterministic in-memory display. Input has visible effects so
+    executions verify: a click inverts a small box under the cursor, a
+    hotkey paints a bar whose colour depends on the keys.
+    """
+
+    name = "fake"
+    out_of_process_capture = False
+    realtime = False
+
+    def __init__(self, width: int = 1280, height: int = 720):
+        self.sct = FakeScreen(width, height)
+        self.cursor = (0, 0)
+        self.events: list[tuple] = []
+
+    def size(self) -> tuple[int, int]:
+        mon = self.sct.monitors[1]
+        return mon["width"], mon["height"]
+
+    def position(self) -> tuple[int, int]:
+        return self.cursor
+
+    def warp(self, x: int, y: int) -> None:
+        self.cursor = (x, y)
+        self.events.append(("move", x, y))
+
+    def click(self) -> None:
+        x, y = self.cursor
+        fb = self.sct.framebuffer
+        fb[max(0, y - 10):y + 10, max(0, x - 20):x + 20, :3] ^= 0xFF
+        self.events.append(("click", x, y))
+
+    def hotkey(self, *keys: str) -> None:
+        fb = self.sct.framebuffer
+        color = sum(map(ord, "+".join(keys))) % 256
+        fb[:24, :, :3] = (color, 255 - color, color // 2)
+        self.events.append(("hotkey",) + keys)
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "xvfb": XvfbBackend,
+    "fake": FakeBackend,
+}
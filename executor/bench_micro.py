@@ -0,0 +1,161 @@
+"""
+Executor microbenchmarks on synthetic BGRA frames (1080p and 4K).
+
+- delta:   original full-frame int16 pixel_delta vs tiled frame_delta
+           (full scan, early exit, coarse pre-pass)
+- hash:    original whole-file sha256 vs streamed / mmap / in-buffer
+- encode:  PNG encoding of a frame (what FrameWriter does off-path) vs
+           FrameStore keyframe / tile-delta segments
+
+Scenarios: "small" (one UI-sized changed region) and "full" (every pixel).
+Results are printed as a table and emitted as JSON for regression tracking.
+
+    python bench_micro.py [--repeat N] [--out results.json]
+"""
+
+import argparse
+import hashlib
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from ui_formats.hashing import sha256_buffer, sha256_file
+
+from capture import encode_png
+from delta import frame_delta
+from framestore import encode_delta, encode_keyframe
+
+
+RESOLUTIONS = {
+    "1080p": (1080, 1920),
+    "4k": (2160, 3840),
+}
+
+
+# -----------------------------
+# BASELINES (original implementations, minus PNG I/O)
+# -----------------------------
+def legacy_pixel_delta(A: np.ndarray, B: np.ndarray) -> int:
+    if A.shape != B.shape:
+        return -1
+    diff = np.abs(A.astype(np.int16) - B.astype(np.int16))
+    return int(np.count_nonzero(diff))
+
+
+def legacy_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+# -----------------------------
+# HARNESS
+# -----------------------------
+def make_frames(height: int, width: int, scenario: str) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    a[..., 3] = 255
+    b = a.copy()
+    if scenario == "small":
+        b[height // 3:height // 3 + 40, width // 2:width // 2 + 200, :3] ^= 0xFF
+    else:
+        b[..., :3] ^= 0xFF
+    return a, b
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 3)
+
+
+def bench_delta(repeat: int) -> dict:
+    out = {}
+    for name, (h, w) in RESOLUTIONS.items():
+        for scenario in ("small", "full"):
+            a, b = make_frames(h, w, scenario)
+            out[f"{name}/{scenario}"] = {
+                "legacy_ms": best_of(lambda: legacy_pixel_delta(a, b), repeat),
+                "tiled_ms": best_of(lambda: frame_delta(a, b), repeat),
+                "early_exit_ms": best_of(lambda: frame_delta(a, b, threshold=1000), repeat),
+                "pyramid_ms": best_of(lambda: frame_delta(a, b, threshold=1000, coarse_step=8), repeat),
+            }
+    return out
+
+
+def bench_hash(repeat: int, tmp: Path) -> dict:
+    out = {}
+    for name, (h, w) in RESOLUTIONS.items():
+        frame, _ = make_frames(h, w, "small")
+        path = tmp / f"{name}.raw"
+        path.write_bytes(frame.tobytes())
+        out[name] = {
+            "bytes": frame.nbytes,
+            "legacy_read_all_ms": best_of(lambda: legacy_sha256(path), repeat),
+            "streamed_ms": best_of(lambda: sha256_file(path), repeat),
+            "mmap_ms": best_of(lambda: sha256_file(path, use_mmap=True), repeat),
+            "in_buffer_ms": best_of(lambda: sha256_buffer(frame), repeat),
+        }
+    return out
+
+
+def bench_encode(repeat: int, tmp: Path) -> dict:
+    out = {}
+    for name, (h, w) in RESOLUTIONS.items():
+        frame, changed = make_frames(h, w, "small")
+        path = tmp / f"{name}.png"
+        out[name] = {
+            "png_encode_ms": best_of(lambda: encode_png(frame, path), repeat),
+            "png_bytes": path.stat().st_size,
+            "keyframe_encode_ms": best_of(lambda: encode_keyframe(frame, 64), repeat),
+            "keyframe_bytes": len(encode_keyframe(frame, 64)),
+            "delta_encode_ms": best_of(lambda: encode_delta(frame, changed, 64), repeat),
+            "delta_bytes": len(encode_delta(frame, changed, 64)),
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        results = {
+            "benchmark": "executor_micro",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+            "delta": bench_delta(args.repeat),
+            "hash": bench_hash(args.repeat, tmp),
+            "encode": bench_encode(args.repeat, tmp),
+        }
+
+    print(f"{'delta':<16}{'legacy ms':>12}{'tiled ms':>12}{'early ms':>12}{'pyramid ms':>12}")
+    for key, r in results["delta"].items():
+        print(f"{key:<16}{r['legacy_ms']:>12.1f}{r['tiled_ms']:>12.1f}{r['early_exit_ms']:>12.1f}{r['pyramid_ms']:>12.1f}")
+    print(f"{'hash':<16}{'read-all ms':>12}{'stream ms':>12}{'mmap ms':>12}{'buffer ms':>12}")
+    for key, r in results["hash"].items():
+        print(f"{key:<16}{r['legacy_read_all_ms']:>12.1f}{r['streamed_ms']:>12.1f}{r['mmap_ms']:>12.1f}{r['in_buffer_ms']:>12.1f}")
+    print(f"{'encode':<16}{'png ms':>12}{'png bytes':>12}{'key bytes':>12}{'delta ms':>12}{'delta bytes':>12}")
+    for key, r in results["encode"].items():
+        print(f"{key:<16}{r['png_encode_ms']:>12.1f}{r['png_bytes']:>12}{r['keyframe_bytes']:>12}"
+              f"{r['delta_encode_ms']:>12.1f}{r['delta_bytes']:>12}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+from ui_formats.hashing import sha256_buffer
+
+
+# (x, y, w, h), same convention as DeltaResult.regions.
+# Capture rects are in virtual-screen coordinates (as used by pyautogui).
+Rect = tuple[int, int, int, int]
+
+
+# -----------------------------
+# REGIONS
+# -----------------------------
+def monitor_rect(sct, monitor: int = 0) -> Rect:
+    mon = sct.monitors[monitor]
+    return mon["left"], mon["top"], mon["width"], mon["height"]
+
+
+def clip_rect(rect: Rect, bounds: Rect) -> Rect | None:
+    x0, y0 = max(rect[0], bounds[0]), max(rect[1], bounds[1])
+    x1 = min(rect[0] + rect[2], bounds[0] + bounds[2])
+    y1 = min(rect[1] + rect[3], bounds[1] + bounds[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def region_around(point: tuple[int, int], size: tuple[int, int], bounds: Rect) -> Rect:
+    """
+    A `size` (w, h) rect centred on `point` (e.g. the last action's
+    coordinates), shifted, not shrunk, to stay inside `bounds`.
+    """
+    w, h = min(size[0], bounds[2]), min(size[1], bounds[3])
+    x = min(max(point[0] - w // 2, bounds[0]), bounds[0] + bounds[2] - w)
+    y = min(max(point[1] - h // 2, bounds[1]), bounds[1] + bounds[3] - h)
+    return x, y, w, h
+
+
+def resolve_region(sct, monitor: int = 0, region: Rect | None = None) -> Rect:
+    """
+    The rect grab_frame() will actually capture: `region` clipped to the
+    monitor, or the whole monitor.
+    """
+    bounds = monitor_rect(sct, monitor)
+    if region is None:
+        return bounds
+    rect = clip_rect(region, bounds)
+    if rect is None:
+        raise ValueError(f"Region {region} is outside monitor {monitor} {bounds}")
+    return rect
+
+
+# -----------------------------
+# CAPTURE
+# -----------------------------
+def grab_frame(sct, monitor: int = 0, region: Rect | None = None) -> np.ndarray:
+    """
+    Grab the raw BGRA buffer of a monitor, or of `region` within it, into
+    an (H, W, 4) uint8 array. Only the region's pixels are copied.
+    No encoding, no disk I/O. Monitor 0 is the full virtual screen.
+    """
+    if region is None:
+        shot = sct.grab(sct.monitors[monitor])
+    else:
+        x, y, w, h = resolve_region(sct, monitor, region)
+        shot = sct.grab({"left": x, "top": y, "width": w, "height": h})
+    return np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+def frame_sha256(frame: np.ndarray) -> str:
+    """
+    Hash the raw pixel buffer (not the encoded file).
+    """
+    return sha256_buffer(np.ascontiguousarray(frame))
+
+
+def frame_dhash(frame: np.ndarray, size: int = 8) -> int:
+    """
+    64-bit difference hash (dHash) of a BGRA frame: average luma over a
+    (size) x (size + 1) grid, one bit per horizontal gradient. Similar
+    screens give hashes a few bits apart. Computed from a strided sample
+    of the frame, so it costs far less than a full pass.
+    """
+    h, w = frame.shape[:2]
+    step = max(1, min(h // (size * 4), w // ((size + 1) * 4)))
+    luma = frame[::step, ::step, :3].astype(np.float32) @ np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+    ys = np.linspace(0, luma.shape[0], size + 1).astype(int)
+    xs = np.linspace(0, luma.shape[1], size + 2).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(luma, ys[:-1], axis=0), xs[:-1], axis=1)
+    means = sums / np.outer(np.diff(ys), np.diff(xs))
+
+    bits = means[:, 1:] > means[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+# -----------------------------
+# PERSISTENCE (off the critical path)
+# -----------------------------
+def encode_png(frame: np.ndarray, path: Path) -> Path:
+    h, w = frame.shape[:2]
+    img = Image.frombuffer("RGB", (w, h), np.ascontiguousarray(frame), "raw", "BGRX", 0, 1)
+    img.save(path, format="PNG")
+    return path
+
+
+class FrameWriter:
+    """
+    Encodes and persists frames on a background thread.
+
+    Frames handed to submit() must not be mutated afterwards.
+    close() blocks until every pending write is on disk.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame-writer")
+
+    def submit(self, frame: np.ndarray, path: Path) -> Future:
+        return self._pool.submit(encode_png, frame, path)
+
+    def run(self, fn, *args) -> Future:
+        # Arbitrary encode/persist job (e.g. FrameStore blobs)
+        return self._pool.submit(fn, *args)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
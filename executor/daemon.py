@@ -0,0 +1,127 @@
+"""
+Long-lived executor.
+
+Imports pyautogui/numpy/PIL/mss once, keeps a single display backend,
+frame writer and reporting session warm, and runs jobs received on a local
+socket back to back (one at a time: there is only one display).
+
+    python daemon.py serve
+    python daemon.py submit --environment local-os-demo
+
+Protocol: newline-delimited JSON over TCP on 127.0.0.1.
+A job is {"environment": "..."}; the reply is the run() result dict.
+"""
+
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+
+from backends import LocalBackend
+from capture import FrameWriter
+from reporting import Reporter
+from run_once import BACKEND_URL, SPOOL_PATH, UPLOAD_TO_STORAGE, run
+from upload import Uploader
+
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8766
+
+
+# -----------------------------
+# SERVER
+# -----------------------------
+class JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+            except ValueError:
+                self._reply({"error": "invalid JSON"})
+                continue
+
+            future = Future()
+            self.server.jobs.put((job, future))
+            try:
+                self._reply(future.result())
+            except Exception as e:
+                self._reply({"error": f"{type(e).__name__}: {e}"})
+
+    def _reply(self, obj: dict) -> None:
+        self.wfile.write(json.dumps(obj).encode() + b"\n")
+        self.wfile.flush()
+
+
+class JobServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, JobHandler)
+        self.jobs: queue.Queue = queue.Queue()
+
+
+def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> None:
+    server = JobServer((host, port))
+    threading.Thread(target=server.serve_forever, name="daemon-accept", daemon=True).start()
+    print(f"executor daemon listening on {host}:{port}")
+
+    # Jobs run on the main thread: pyautogui and some mss backends
+    # are not safe to drive from arbitrary threads.
+    with Reporter(BACKEND_URL, SPOOL_PATH) as reporter, LocalBackend() as backend, FrameWriter() as writer, \
+            (Uploader(BACKEND_URL) if UPLOAD_TO_STORAGE else nullcontext()) as uploader:
+        try:
+            while True:
+                job, future = server.jobs.get()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(run(
+                        reporter, backend, writer, environment=job.get("environment", "local-os-demo"), uploader=uploader,
+                    ))
+                except Exception as e:
+                    future.set_exception(e)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+# -----------------------------
+# CLIENT
+# -----------------------------
+def submit(job: dict, host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> dict:
+    with socket.create_connection((host, port)) as conn:
+        conn.sendall(json.dumps(job).encode() + b"\n")
+        with conn.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve")
+    p_serve.add_argument("--port", type=int, default=DAEMON_PORT)
+    p_submit = sub.add_parser("submit")
+    p_submit.add_argument("--port", type=int, default=DAEMON_PORT)
+    p_submit.add_argument("--environment", default="local-os-demo")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(port=args.port)
+    else:
+        result = submit({"environment": args.environment}, port=args.port)
+        print(json.dumps(result))
+        sys.exit(0 if result.get("verified") else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# -----------------------------
+# RESULT
+# -----------------------------
+@dataclass
+class DeltaResult:
+    """
+    Outcome of a frame comparison.
+
+    changed      -- number of changed pixels found (a lower bound if early_exit)
+    tile_counts  -- (rows, cols) changed-pixel count per tile
+    regions      -- bounding boxes (x, y, w, h) of connected changed tiles
+    early_exit   -- True if the scan stopped once `threshold` was reached
+    """
+
+    changed: int
+    tile_size: int
+    tile_counts: np.ndarray
+    regions: list[tuple[int, int, int, int]] = field(default_factory=list)
+    early_exit: bool = False
+
+
+# -----------------------------
+# ENGINE
+# -----------------------------
+def _as_pixels(frame: np.ndarray) -> np.ndarray:
+    """
+    View a BGRA uint8 frame as one uint32 per pixel (no copy), so a pixel
+    compares in a single op. Other layouts are returned unchanged.
+    """
+    if (
+        frame.ndim == 3
+        and frame.shape[2] == 4
+        and frame.dtype == np.uint8
+        and frame.strides[2] == 1
+        and frame.strides[1] == 4
+    ):
+        return frame.view(np.uint32)[..., 0]
+    return frame
+
+
+def _tile_changed(ta: np.ndarray, tb: np.ndarray, scratch: np.ndarray) -> int:
+    th, tw = ta.shape[:2]
+    if ta.ndim == 2:
+        out = scratch[:th, :tw]
+        np.not_equal(ta, tb, out=out)
+        return int(np.count_nonzero(out))
+    # Multi-channel fallback: a pixel is changed if any channel differs
+    return int(np.count_nonzero((ta != tb).any(axis=-1)))
+
+
+def _regions(counts: np.ndarray, tile: int, height: int, width: int) -> list[tuple[int, int, int, int]]:
+    rows, cols = counts.shape
+    seen = np.zeros(counts.shape, dtype=bool)
+    boxes = []
+
+    for r in range(rows):
+        for c in range(cols):
+            if seen[r, c] or counts[r, c] == 0:
+                continue
+            r0 = r1 = r
+            c0 = c1 = c
+            seen[r, c] = True
+            queue = deque([(r, c)])
+            while queue:
+                qr, qc = queue.popleft()
+                r0, r1 = min(r0, qr), max(r1, qr)
+                c0, c1 = min(c0, qc), max(c1, qc)
+                for nr, nc in ((qr - 1, qc), (qr + 1, qc), (qr, qc - 1), (qr, qc + 1)):
+                    if 0 <= nr < rows and 0 <= nc < cols and not seen[nr, nc] and counts[nr, nc]:
+                        seen[nr, nc] = True
+                        queue.append((nr, nc))
+
+            x, y = c0 * tile, r0 * tile
+            boxes.append((x, y, min((c1 + 1) * tile, width) - x, min((r1 + 1) * tile, height) - y))
+
+    return boxes
+
+
+def frame_delta(
+    a: np.ndarray,
+    b: np.ndarray,
+    tile: int = 64,
+    threshold: int | None = None,
+    coarse_step: int | None = None,
+    roi: tuple[int, int, int, int] | None = None,
+) -> DeltaResult | None:
+    """
+    Compare two frames tile by tile.
+
+    threshold   -- stop as soon as this many changed pixels have been seen
+    coarse_step -- run a strided pre-pass sampling every Nth pixel; tiles it
+                   flags are scanned first, and since sampled pixels are real
+                   pixels its count alone may already satisfy `threshold`
+    roi         -- (x, y, w, h) in frame coordinates: compare only this
+                   part of the frames; regions are reported in frame
+                   coordinates, tile_counts relative to the roi
+
+    Only tile-sized scratch memory is allocated in the scan loop.
+    Regions are tile-granular. Returns None if the frame shapes differ.
+    """
+    if a.shape != b.shape:
+        return None
+    if roi is not None:
+        x, y, w, h = roi
+        result = frame_delta(a[y:y + h, x:x + w], b[y:y + h, x:x + w], tile, threshold, coarse_step)
+        result.regions = [(rx + x, ry + y, rw, rh) for rx, ry, rw, rh in result.regions]
+        return result
+
+    pa, pb = _as_pixels(a), _as_pixels(b)
+    height, width = pa.shape[:2]
+    rows, cols = -(-height // tile), -(-width // tile)
+    counts = np.zeros((rows, cols), dtype=np.int64)
+    order = [(r, c) for r in range(rows) for c in range(cols)]
+
+    if coarse_step and coarse_step > 1:
+        coarse = np.zeros((rows, cols), dtype=np.int64)
+        coarse_total = 0
+        for r, c in order:
+            ys, xs = r * tile, c * tile
+            sa = pa[ys:ys + tile:coarse_step, xs:xs + tile:coarse_step]
+            sb = pb[ys:ys + tile:coarse_step, xs:xs + tile:coarse_step]
+            hits = sa != sb
+            coarse[r, c] = np.count_nonzero(hits if hits.ndim == 2 else hits.any(axis=-1))
+            coarse_total += int(coarse[r, c])
+            if threshold is not None and coarse_total >= threshold:
+                break
+
+        if threshold is not None and coarse_total >= threshold:
+            return DeltaResult(
+                changed=coarse_total,
+                tile_size=tile,
+                tile_counts=coarse,
+                regions=_regions(coarse, tile, height, width),
+                early_exit=True,
+            )
+
+        order.sort(key=lambda rc: coarse[rc] == 0)
+
+    scratch = np.empty((tile, tile), dtype=bool)
+    total = 0
+    early = False
+
+    for r, c in order:
+        ys, xs = r * tile, c * tile
+        n = _tile_changed(pa[ys:ys + tile, xs:xs + tile], pb[ys:ys + tile, xs:xs + tile], scratch)
+        counts[r, c] = n
+        total += n
+        if threshold is not None and total >= threshold:
+            early = True
+            break
+
+    return DeltaResult(
+        changed=total,
+        tile_size=tile,
+        tile_counts=counts,
+        regions=_regions(counts, tile, height, width),
+        early_exit=early,
+    )
@@ -0,0 +1,96 @@
+"""
+Keyframe + tile-delta frame storage.
+
+Every frame of an execution gets a sequence number. Every
+`keyframe_interval`-th frame is stored whole (a keyframe); the others
+store only the tiles that changed since the previous frame. Consecutive
+UI frames usually differ in a small region, so deltas are a fraction of
+a keyframe's size.
+
+The blob format (one file per frame) is defined in ui_formats.frames,
+whose decoder the backend uses to rebuild and verify frames.
+"""
+
+import zlib
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from ui_formats.frames import KIND_DELTA, KIND_KEY, pack_delta_index, pack_header
+
+from capture import FrameWriter
+from delta import frame_delta
+
+
+@dataclass
+class FrameRef:
+    sequence: int
+    encoding: str  # keyframe | delta
+    keyframe_sequence: int
+    path: Path
+    # Resolves once the blob is on disk
+    written: Future | None = field(default=None, repr=False, compare=False)
+
+
+def encode_keyframe(frame: np.ndarray, tile: int, level: int = 6) -> bytes:
+    h, w, c = frame.shape
+    return pack_header(KIND_KEY, h, w, c, tile) + zlib.compress(np.ascontiguousarray(frame).data, level)
+
+
+def encode_delta(prev: np.ndarray, frame: np.ndarray, tile: int, level: int = 6) -> bytes:
+    h, w, c = frame.shape
+    result = frame_delta(prev, frame, tile=tile)
+    rows, cols = np.nonzero(result.tile_counts)
+    tiles = list(zip(rows.tolist(), cols.tolist()))
+
+    comp = zlib.compressobj(level)
+    body = [comp.compress(pack_delta_index(tiles))]
+    for r, cc in tiles:
+        body.append(comp.compress(np.ascontiguousarray(frame[r * tile:(r + 1) * tile, cc * tile:(cc + 1) * tile]).data))
+    body.append(comp.flush())
+
+    return pack_header(KIND_DELTA, h, w, c, tile) + b"".join(body)
+
+
+class FrameStore:
+    """
+    Assigns sequence numbers and encodes frames on the FrameWriter thread.
+
+    add() returns immediately with the FrameRef needed for the observation
+    record; the blob is written in the background. Frames handed to add()
+    must not be mutated afterwards.
+    """
+
+    def __init__(self, writer: FrameWriter, directory: Path, keyframe_interval: int = 30, tile: int = 64):
+        self.writer = writer
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.tile = tile
+        self._sequence = 0
+        self._keyframe_sequence = 0
+        self._prev: np.ndarray | None = None
+
+    def add(self, frame: np.ndarray) -> FrameRef:
+        seq = self._sequence
+        prev = self._prev
+        is_key = prev is None or prev.shape != frame.shape or seq % self.keyframe_interval == 0
+        if is_key:
+            self._keyframe_sequence = seq
+
+        ref = FrameRef(
+            sequence=seq,
+            encoding="keyframe" if is_key else "delta",
+            keyframe_sequence=self._keyframe_sequence,
+            path=self.directory / f"{seq:06d}.{'key' if is_key else 'dlt'}.pzf",
+        )
+        ref.written = self.writer.run(self._write, ref.path, frame, None if is_key else prev)
+
+        self._prev = frame
+        self._sequence += 1
+        return ref
+
+    def _write(self, path: Path, frame: np.ndarray, prev: np.ndarray | None) -> Path:
+        data = encode_keyframe(frame, self.tile) if prev is None else encode_delta(prev, frame, self.tile)
+        path.write_bytes(data)
+        return path
@@ -0,0 +1,40 @@
+"""
+Background SHA-256 hashing for the capture path.
+
+The digests come from ui_formats.hashing, which the backend's verifier
+uses too. hashlib releases the GIL on large updates, so hash_async()
+runs truly concurrently with capture and diff work on other threads.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from ui_formats.hashing import CHUNK_SIZE, sha256_buffer, sha256_file
+
+
+# -----------------------------
+# BACKGROUND HASHING
+# -----------------------------
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hasher")
+        return _pool
+
+
+def hash_async(buf) -> Future:
+    """
+    Hash a buffer on a worker thread. The buffer must not be mutated
+    until the future resolves.
+    """
+    return _get_pool().submit(sha256_buffer, buf)
+
+
+def hash_file_async(path: Path, use_mmap: bool = False) -> Future:
+    return _get_pool().submit(sha256_file, path, CHUNK_SIZE, use_mmap)
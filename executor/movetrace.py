@@ -0,0 +1,31 @@
+"""
+Mouse-move trace collection.
+
+Samples are shipped as one compact mouse_trace action, encoded with
+ui_formats.movetrace (the backend decodes with the same module).
+"""
+
+import time
+
+
+class MoveTrace:
+    """
+    Collects cursor samples as they are produced; points() is relative
+    to the first sample.
+    """
+
+    def __init__(self):
+        self._start: float | None = None
+        self._points: list[tuple[int, int, int]] = []
+
+    def add(self, x: int, y: int) -> None:
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        self._points.append((round((now - self._start) * 1000), int(x), int(y)))
+
+    def points(self) -> list[tuple[int, int, int]]:
+        return list(self._points)
+
+    def __len__(self) -> int:
+        return len(self._points)
@@ -0,0 +1,300 @@
+"""
+Continuous capture into a shared-memory ring buffer.
+
+A separate capture process grabs frames at a fixed FPS straight into a
+fixed-size ring of frame slots in shared memory (no pickling, no copies
+through pipes). In this process a promoter thread walks the ring in
+sequence order and promotes only frames that differ from the last
+promoted one; unchanged frames are never copied, encoded or uploaded.
+
+Shared memory layout (one SharedMemory block):
+
+    ctrl    int64[2]          latest written sequence, dropped grabs
+    meta    int64[slots, 3]   per slot: begin seq, end seq, captured ns
+    frames  uint8[slots, H, W, 4]
+
+Each slot is a seqlock: the writer bumps `begin`, writes pixels and
+timestamp, then sets `end`. A reader accepts a slot only if begin == end
+== the sequence it expects, both before and after copying it out.
+If the promoter falls more than `slots` frames behind, the overwritten
+frames are counted as overruns and skipped.
+"""
+
+import multiprocessing as mp
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+
+from capture import Rect, grab_frame, resolve_region
+from delta import frame_delta
+
+CTRL_LATEST = 0
+CTRL_DROPPED = 1
+META_BEGIN = 0
+META_END = 1
+META_TIME = 2
+ALIGN = 64
+
+
+# -----------------------------
+# RING BUFFER
+# -----------------------------
+class FrameRing:
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, height: int, width: int, owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.shape = (height, width, 4)
+        self.owner = owner
+
+        buf = shm.buf
+        self.ctrl = np.ndarray((2,), dtype=np.int64, buffer=buf, offset=0)
+        self.meta = np.ndarray((slots, 3), dtype=np.int64, buffer=buf, offset=16)
+        self.frames = np.ndarray((slots, height, width, 4), dtype=np.uint8, buffer=buf,
+                                 offset=self._frames_offset(slots))
+
+    @staticmethod
+    def _frames_offset(slots: int) -> int:
+        return -(-(16 + slots * 24) // ALIGN) * ALIGN
+
+    @classmethod
+    def create(cls, slots: int, height: int, width: int) -> "FrameRing":
+        size = cls._frames_offset(slots) + slots * height * width * 4
+        ring = cls(shared_memory.SharedMemory(create=True, size=size), slots, height, width, owner=True)
+        ring.ctrl[:] = (-1, 0)
+        ring.meta[:] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slots: int, height: int, width: int) -> "FrameRing":
+        return cls(shared_memory.SharedMemory(name=name), slots, height, width, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest(self) -> int:
+        return int(self.ctrl[CTRL_LATEST])
+
+    def write(self, seq: int, frame: np.ndarray, captured_ns: int) -> None:
+        slot = seq % self.slots
+        self.meta[slot, META_BEGIN] = seq
+        np.copyto(self.frames[slot], frame)
+        self.meta[slot, META_TIME] = captured_ns
+        self.meta[slot, META_END] = seq
+        self.ctrl[CTRL_LATEST] = seq
+
+    def view(self, seq: int) -> np.ndarray | None:
+        """Zero-copy view of frame `seq`, or None if it was overwritten."""
+        slot = seq % self.slots
+        if self.meta[slot, META_BEGIN] != seq or self.meta[slot, META_END] != seq:
+            return None
+        return self.frames[slot]
+
+    def still_valid(self, seq: int) -> bool:
+        slot = seq % self.slots
+        return self.meta[slot, META_BEGIN] == seq and self.meta[slot, META_END] == seq
+
+    def captured_at(self, seq: int) -> datetime:
+        return datetime.fromtimestamp(self.meta[seq % self.slots, META_TIME] / 1e9, tz=timezone.utc)
+
+    def close(self) -> None:
+        # Drop views before closing the mapping
+        self.ctrl = self.meta = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# -----------------------------
+# CAPTURE PROCESS
+# -----------------------------
+def capture_loop(
+    name: str,
+    slots: int,
+    height: int,
+    width: int,
+    monitor: int,
+    region: Rect | None,
+    fps: float,
+    stop,
+    display: str | None = None,
+) -> None:
+    """
+    Capture process entry point: grab `monitor` (or `region` of it) at
+    `fps` into the ring until `stop` is set. Grabs that overrun their
+    frame period are not caught up; the next one is scheduled from the
+    current time.
+    """
+    from mss import mss
+
+    ring = FrameRing.attach(name, slots, height, width)
+    period = 1.0 / fps
+    seq = 0
+    try:
+        with (mss(display=display) if display else mss()) as sct:
+            next_at = time.monotonic()
+            while not stop.is_set():
+                frame = grab_frame(sct, monitor, region)
+                if frame.shape != ring.shape:
+                    # Resolution changed under us: stop rather than mix geometries
+                    break
+                ring.write(seq, frame, time.time_ns())
+                seq += 1
+
+                next_at += period
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    stop.wait(delay)
+                else:
+                    ring.ctrl[CTRL_DROPPED] += int(-delay // period)
+                    next_at = time.monotonic()
+    finally:
+        ring.close()
+
+
+# -----------------------------
+# RECORDER
+# -----------------------------
+@dataclass
+class RecorderStats:
+    captured: int = 0
+    examined: int = 0
+    promoted: int = 0
+    overruns: int = 0
+    dropped: int = 0
+
+
+class ContinuousRecorder:
+    """
+    Continuous capture of one monitor, or of a region of it.
+
+        with ContinuousRecorder(sct, on_frame, fps=10) as rec:
+            ... drive the UI ...
+        rec.stats
+
+    on_frame(frame, captured_at) is called on the promoter thread, in
+    capture order, with a private copy of every frame that differs from
+    the previously promoted one by at least `min_changed_pixels`.
+    The first frame is promoted unless it matches `reference` (e.g. a
+    frame the caller has already stored).
+    """
+
+    def __init__(
+        self,
+        sct,
+        on_frame: Callable[[np.ndarray, datetime], None],
+        fps: float = 10.0,
+        slots: int = 32,
+        monitor: int = 0,
+        min_changed_pixels: int = 1,
+        tile: int = 64,
+        poll_interval: float | None = None,
+        reference: np.ndarray | None = None,
+        region: Rect | None = None,
+        display: str | None = None,
+    ):
+        rect = resolve_region(sct, monitor, region)
+        self.on_frame = on_frame
+        self.fps = fps
+        self.slots = slots
+        self.monitor = monitor
+        self.region = rect if region is not None else None
+        self.display = display
+        self.min_changed_pixels = min_changed_pixels
+        self.tile = tile
+        self.poll_interval = poll_interval if poll_interval is not None else 0.5 / fps
+        self.stats = RecorderStats()
+
+        self._shape = (rect[3], rect[2])
+        self._ctx = mp.get_context("spawn")  # no inherited X11/mss handles
+        self._stop = self._ctx.Event()
+        self._done = threading.Event()
+        self._ring: FrameRing | None = None
+        self._process = None
+        self._thread: threading.Thread | None = None
+        self._last: np.ndarray | None = reference
+        self._next_seq = 0
+
+    def start(self) -> "ContinuousRecorder":
+        height, width = self._shape
+        self._ring = FrameRing.create(self.slots, height, width)
+        self._process = self._ctx.Process(
+            target=capture_loop,
+            args=(self._ring.name, self.slots, height, width, self.monitor, self.region, self.fps, self._stop,
+                  self.display),
+            name="continuous-capture",
+            daemon=True,
+        )
+        self._process.start()
+        self._thread = threading.Thread(target=self._promote_loop, name="capture-promoter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> RecorderStats:
+        if self._process is None:
+            return self.stats
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        # Capture has stopped: let the promoter drain what is left in the ring
+        self._done.set()
+        self._thread.join()
+
+        self.stats.captured = self._ring.latest + 1
+        self.stats.dropped = int(self._ring.ctrl[CTRL_DROPPED])
+        self._ring.close()
+        self._process = self._thread = self._ring = None
+        return self.stats
+
+    def _promote_loop(self) -> None:
+        while True:
+            done = self._done.is_set()
+            latest = self._ring.latest
+            while self._next_seq <= latest:
+                self._examine(self._next_seq, latest)
+                self._next_seq += 1
+            if done:
+                return
+            self._done.wait(self.poll_interval)
+
+    def _examine(self, seq: int, latest: int) -> None:
+        ring = self._ring
+        if latest - seq >= ring.slots:
+            self.stats.overruns += 1
+            return
+        view = ring.view(seq)
+        if view is None:
+            self.stats.overruns += 1
+            return
+        self.stats.examined += 1
+
+        # Compare in place; only promoted frames are copied out
+        if self._last is not None:
+            delta = frame_delta(self._last, view, tile=self.tile, threshold=self.min_changed_pixels)
+            if delta is not None and delta.changed < self.min_changed_pixels:
+                return
+
+        frame = view.copy()
+        captured_at = ring.captured_at(seq)
+        if not ring.still_valid(seq):
+            # Overwritten while we were reading it
+            self.stats.overruns += 1
+            return
+
+        self._last = frame
+        self.stats.promoted += 1
+        self.on_frame(frame, captured_at)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
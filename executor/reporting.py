@@ -0,0 +1,320 @@
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from upload import UploadError, Uploader
+
+
+# Backend unreachable or overloaded: retry later without counting an attempt
+TRANSIENT_STATUSES = {408, 429, 502, 503, 504}
+
+# Single-row endpoints with a bulk counterpart (see backend */batch routes)
+BATCH_ENDPOINTS = {
+    "/observations": "/observations/batch",
+    "/actions": "/actions/batch",
+    "/artifacts": "/artifacts/batch",
+}
+
+
+class Reporter:
+    """
+    Executor -> backend reporting client.
+
+    - One pooled keep-alive session for every request.
+    - emit() appends the event to a durable SQLite spool and returns
+      immediately; a background thread flushes the spool in order,
+      grouping consecutive batchable events into one */batch request.
+    - If the backend is unreachable, events stay spooled and are replayed
+      on the next flush (or by the next Reporter opened on the same spool).
+    - A rejected or failing batch is replayed row by row, so one bad event
+      never takes valid neighbours (possibly of other executions) with it.
+      An event the backend rejects (4xx), or that keeps failing (5xx other
+      than 502/503/504) for max_attempts flushes, is moved to the
+      dead_letter table instead of blocking the spool; requeue_dead_letters()
+      puts them back.
+    - emit_upload() spools an event whose file still has to reach object
+      storage: the flush uploads it first and fills in its storage_uri.
+      Uploads that fail stay spooled like any other event.
+
+    Only request() blocks, for calls whose response is needed (e.g. start).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        spool_path: Path,
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        timeout: float = 10,
+        pool_size: int = 4,
+        max_attempts: int = 5,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._db = sqlite3.connect(str(spool_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " path TEXT NOT NULL,"
+            " body TEXT,"
+            " params TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            " seq INTEGER PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " body TEXT,"
+            " params TEXT,"
+            " status INTEGER,"
+            " response TEXT)"
+        )
+        # Spools written by older executors
+        self._add_column("spool", "attempts", "INTEGER NOT NULL DEFAULT 0")
+        self._add_column("spool", "upload", "TEXT")
+        self._add_column("dead_letter", "upload", "TEXT")
+        self._uploader: Uploader | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="reporter-flush", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # PUBLIC
+    # -----------------------------
+    def request(self, path: str, payload: dict | None = None, params: dict | None = None) -> dict:
+        r = self.session.post(f"{self.base_url}{path}", json=payload, params=params, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def emit(self, path: str, payload: dict | None = None, params: dict | None = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO spool (path, body, params) VALUES (?, ?, ?)",
+                (path, json.dumps(payload) if payload is not None else None,
+                 json.dumps(params) if params is not None else None),
+            )
+        if self.pending() >= self.batch_size:
+            self._wake.set()
+
+    def emit_upload(self, file: Path, path: str, payload: dict) -> None:
+        """
+        emit() once `file` is in object storage: the flush uploads it and
+        sets payload["storage_uri"] before sending the event.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO spool (path, body, upload) VALUES (?, ?, ?)",
+                (path, json.dumps(payload), str(file)),
+            )
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def dead_letters(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def requeue_dead_letters(self) -> int:
+        """
+        Move dead-lettered events back into the spool (e.g. after a backend
+        fix); they keep their original order relative to each other.
+        """
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO spool (path, body, params, upload) "
+                "SELECT path, body, params, upload FROM dead_letter ORDER BY seq"
+            )
+            self._db.execute("DELETE FROM dead_letter")
+        self._wake.set()
+        return cur.rowcount
+
+    def flush(self) -> bool:
+        """
+        Send everything currently spooled. Returns False if the backend
+        could not be reached; remaining events stay in the spool.
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> bool:
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT seq, path, body, params, upload FROM spool ORDER BY seq LIMIT ?",
+                    (self.batch_size,),
+                ).fetchall()
+            if not rows:
+                return True
+
+            if rows[0][4] is not None:
+                if not self._upload_one(rows[0]):
+                    return False
+                continue
+
+            # Leading run of events for the same batchable endpoint
+            first_path = rows[0][1]
+            if first_path in BATCH_ENDPOINTS:
+                group = []
+                for row in rows:
+                    if row[1] != first_path or row[4] is not None:
+                        break
+                    group.append(row)
+                if len(group) > 1:
+                    try:
+                        r = self.session.post(
+                            f"{self.base_url}{BATCH_ENDPOINTS[first_path]}",
+                            json=[json.loads(row[2]) for row in group],
+                            timeout=self.timeout,
+                        )
+                    except requests.RequestException:
+                        return False
+                    if r.status_code in TRANSIENT_STATUSES:
+                        return False
+                    if r.status_code < 400:
+                        self._delete(group[0][0], group[-1][0])
+                        continue
+                    # Isolate the bad event(s): replay the group one event at a time
+                    for row in group:
+                        if not self._send_one(row):
+                            return False
+                    continue
+
+            if not self._send_one(rows[0]):
+                return False
+
+    def _send_one(self, row: tuple) -> bool:
+        """
+        Send one spooled event through its single-row endpoint. False if
+        it should be retried later (the spool stops there).
+        """
+        seq, path, body, params, _ = row
+        try:
+            r = self.session.post(
+                f"{self.base_url}{path}",
+                json=json.loads(body) if body else None,
+                params=json.loads(params) if params else None,
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            return False
+
+        if r.status_code in TRANSIENT_STATUSES:
+            return False
+        if r.status_code < 400:
+            self._delete(seq, seq)
+            return True
+        if r.status_code >= 500 and self._attempt(seq) < self.max_attempts:
+            return False
+
+        # Rejected, or failing for good: park it, keep the rest flowing
+        self._dead_letter(row, r.status_code, r.text)
+        return True
+
+    def _upload_one(self, row: tuple) -> bool:
+        """
+        Upload the file of a spooled emit_upload() event and turn it into
+        a plain event. False if it should be retried later.
+        """
+        seq, path, body, _, upload = row
+        file = Path(upload)
+        if not file.is_file():
+            self._dead_letter(row, None, f"file not found: {file}")
+            return True
+        if self._uploader is None:
+            self._uploader = Uploader(self.base_url, workers=1, timeout=max(self.timeout, 60))
+        try:
+            storage_uri = self._uploader.upload(file)
+        except requests.RequestException:
+            return False
+        except UploadError as e:
+            if e.status in TRANSIENT_STATUSES or self._attempt(seq) < self.max_attempts:
+                return False
+            self._dead_letter(row, e.status, str(e))
+            return True
+
+        payload = json.loads(body)
+        payload["storage_uri"] = storage_uri
+        with self._lock:
+            self._db.execute(
+                "UPDATE spool SET body = ?, upload = NULL, attempts = 0 WHERE seq = ?",
+                (json.dumps(payload), seq),
+            )
+        return True
+
+    def _attempt(self, seq: int) -> int:
+        with self._lock:
+            self._db.execute("UPDATE spool SET attempts = attempts + 1 WHERE seq = ?", (seq,))
+            return self._db.execute("SELECT attempts FROM spool WHERE seq = ?", (seq,)).fetchone()[0]
+
+    def _dead_letter(self, row: tuple, status: int | None, response: str) -> None:
+        seq, path, body, params, upload = row
+        print(f"reporter: dead-lettering event for {path}: {status} {response[:200]}", file=sys.stderr)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO dead_letter (seq, path, body, params, status, response, upload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (seq, path, body, params, status, response[:2000], upload),
+            )
+            self._db.execute("DELETE FROM spool WHERE seq = ?", (seq,))
+
+    def _add_column(self, table: str, column: str, ddl: str) -> None:
+        columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+    def _delete(self, first: int, last: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM spool WHERE seq BETWEEN ? AND ?", (first, last))
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop the background thread and make a final flush attempt.
+        Anything still unsent stays in the spool for replay.
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self.flush()
+        self._db.close()
+        self.session.close()
+        if self._uploader is not None:
+            self._uploader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # BACKGROUND
+    # -----------------------------
+    def _run(self) -> None:
+        backoff = self.flush_interval
+        while not self._stop.is_set():
+            self._wake.wait(backoff)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if self.flush():
+                backoff = self.flush_interval
+            else:
+                backoff = min(backoff * 2, 30.0)
@@ -1,13 +1,21 @@
-import time
-import hashlib
-import requests
+import base64
 import sys
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
 
-import pyautogui
-import numpy as np
-from PIL import Image
-from mss import mss
+from ui_formats.movetrace import encode_trace
+
+from backends import Backend, LocalBackend
+from capture import FrameWriter, frame_dhash, frame_sha256, grab_frame, monitor_rect, region_around, resolve_region
+from delta import frame_delta
+from framestore import FrameStore
+from hashing import hash_async
+from movetrace import MoveTrace
+from recorder import ContinuousRecorder
+from reporting import Reporter
+from settle import preview_sampler, wait_for_settle
+from upload import Uploader
 
 # -----------------------------
 # CONFIG
@@ -15,112 +23,237 @@ from mss import mss
 BACKEND_URL = "http://127.0.0.1:8000"
 OUT_DIR = Path(__file__).parent / "artifacts"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
+SPOOL_PATH = OUT_DIR / "report_spool.sqlite3"
+KEYFRAME_INTERVAL = 30
 
-pyautogui.FAILSAFE = False
-
-
-# -----------------------------
-# UTILS
-# -----------------------------
-def capture_screen(path: Path) -> None:
-    with mss() as sct:
-        sct.shot(output=str(path))
-
+# Upload frame blobs to object storage (presigned, via the backend) and
+# report their s3:// URIs instead of local paths
+UPLOAD_TO_STORAGE = False
 
-def sha256(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        h.update(f.read())
-    return h.hexdigest()
+# Continuous mode: record every visible change between before and after
+CONTINUOUS_CAPTURE = False
+CAPTURE_FPS = 10
+CAPTURE_SLOTS = 32
 
+# What is captured, hashed, diffed and uploaded: the whole monitor, or
+# (opt-in) a (w, h) region around the action point
+CAPTURE_MONITOR = 0
+ROI_SIZE: tuple[int, int] | None = None
 
-def pixel_delta(a: Path, b: Path) -> int:
-    A = np.asarray(Image.open(a))
-    B = np.asarray(Image.open(b))
+SETTLE_STABLE_SAMPLES = 3
+SETTLE_INTERVAL = 0.03
+SETTLE_CHANGE_TIMEOUT = 1.0
+SETTLE_TIMEOUT = 5.0
 
-    if A.shape != B.shape:
-        return -1
 
-    diff = np.abs(A.astype(np.int16) - B.astype(np.int16))
-    return int(np.count_nonzero(diff))
+def observation_payload(execution_id: str, ref, frame, checksum: str, captured_at: datetime) -> dict:
+    # checksum is over the raw pixels, so it verifies the decoded frame;
+    # phash feeds the backend's similarity index. captured_at is the grab
+    # time: spooled events reach the backend later, so it never stamps them.
+    payload = {
+        "execution_id": execution_id,
+        "storage_uri": str(ref.path),
+        "checksum": checksum,
+        "encoding": ref.encoding,
+        "sequence": ref.sequence,
+        "keyframe_sequence": ref.keyframe_sequence,
+        "phash": f"{frame_dhash(frame):016x}",
+        "captured_at": captured_at.isoformat(),
+    }
+    return payload
 
 
-def post_json(url: str, payload: dict):
-    r = requests.post(url, json=payload, timeout=10)
-    r.raise_for_status()
-    return r.json()
+def action_payload(
+    execution_id: str,
+    action_type: str,
+    occurred_at: datetime,
+    x: int | None = None,
+    y: int | None = None,
+    button: str | None = None,
+    key: str | None = None,
+    trace: MoveTrace | None = None,
+) -> dict:
+    payload = {
+        "execution_id": execution_id,
+        "action_type": action_type,
+        "occurred_at": occurred_at.isoformat(),
+        # Legacy free-form form of the typed fields below
+        "parameters": ",".join("" if v is None else str(v) for v in (x, y, button, key)),
+        "x": x,
+        "y": y,
+        "button": button,
+        "key": key,
+    }
+    if trace is not None and len(trace):
+        payload["trace"] = base64.b64encode(encode_trace(trace.points())).decode()
+    return payload
 
 
-def post_params(url: str, params: dict):
-    r = requests.post(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
+def now() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 # -----------------------------
 # MAIN (CRE EXECUTION)
 # -----------------------------
-def main():
-    exec_resp = post_json(f"{BACKEND_URL}/executions/start", {
-        "environment": "local-os-demo"
+def run(
+    reporter: Reporter,
+    backend: Backend,
+    writer: FrameWriter,
+    environment: str = "local-os-demo",
+    continuous: bool = CONTINUOUS_CAPTURE,
+    monitor: int = CAPTURE_MONITOR,
+    roi_size: tuple[int, int] | None = ROI_SIZE,
+    uploader: Uploader | None = None,
+) -> dict:
+    """
+    One CRE execution. Process-independent: the daemon and the runner
+    call this repeatedly with long-lived reporter/backend/writer handles.
+
+    With an uploader, each observation is reported once its blob is in
+    object storage; the execution completes after every upload. A failed
+    upload is handed to the reporter's spool, which retries it.
+    """
+    if continuous and not backend.out_of_process_capture:
+        raise ValueError(f"continuous capture is not supported by the {backend.name} backend")
+    sct = backend.sct
+    exec_resp = reporter.request("/executions/start", {
+        "environment": environment
     })
     execution_id = exec_resp["id"]
+    uploads = []
+    result = {"execution_id": execution_id, "verified": False, "pixels_changed": -1}
+    try:
+        run_dir = OUT_DIR / execution_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        frames = FrameStore(writer, run_dir, keyframe_interval=KEYFRAME_INTERVAL)
 
-    before_path = OUT_DIR / "before.png"
-    capture_screen(before_path)
-    before_hash = sha256(before_path)
+        def report_observation(ref, frame, checksum, captured_at):
+            payload = observation_payload(execution_id, ref, frame, checksum, captured_at)
+            if uploader is None:
+                reporter.emit("/observations", payload)
+                return
 
-    post_json(f"{BACKEND_URL}/observations", {
-        "execution_id": execution_id,
-        "storage_uri": str(before_path),
-        "checksum": before_hash
-    })
+            def uploaded(storage_uri):
+                payload["storage_uri"] = storage_uri
+                reporter.emit("/observations", payload)
 
-    time.sleep(0.5)
+            uploads.append((uploader.submit(ref.path, after=ref.written, then=uploaded), ref.path, payload))
 
-    # ---- REAL OS ACTION ----
-    w, h = pyautogui.size()
-    x, y = w // 2, h // 2
-    pyautogui.moveTo(x, y, duration=0.3)
-    pyautogui.click()
-    time.sleep(0.3)
-    pyautogui.hotkey("alt", "f1")
+        # Action point first: the capture region is built around it. Both
+        # come from the captured monitor, in virtual-screen coordinates
+        bounds = monitor_rect(sct, monitor)
+        x, y = bounds[0] + bounds[2] // 2, bounds[1] + bounds[3] // 2
+        region = region_around((x, y), roi_size, bounds) if roi_size else None
+        rect = resolve_region(sct, monitor, region)
 
-    time.sleep(0.7)
+        sample = preview_sampler(sct, monitor=monitor, region=region)
+        settle = dict(
+            stable_samples=SETTLE_STABLE_SAMPLES,
+            interval=SETTLE_INTERVAL,
+            change_timeout=SETTLE_CHANGE_TIMEOUT,
+            timeout=SETTLE_TIMEOUT,
+        )
 
-    after_path = OUT_DIR / "after.png"
-    capture_screen(after_path)
-    after_hash = sha256(after_path)
+        # Start from a quiet screen
+        wait_for_settle(sample, require_change=False, **settle)
 
-    changed_pixels = pixel_delta(before_path, after_path)
-    if changed_pixels <= 0:
-        print("CRE FAILURE: no causal pixel change detected")
-        sys.exit(1)
+        before_at = now()
+        before = grab_frame(sct, monitor, region)
+        before_hash = frame_sha256(before)
+        before_ref = frames.add(before)
 
-    post_json(f"{BACKEND_URL}/observations", {
-        "execution_id": execution_id,
-        "storage_uri": str(after_path),
-        "checksum": after_hash
-    })
+        report_observation(before_ref, before, before_hash, before_at)
 
-    post_json(f"{BACKEND_URL}/artifacts", {
-        "execution_id": execution_id,
-        "artifact_type": "pixel_delta",
-        "storage_uri": "before->after",
-        "checksum": f"{before_hash}:{after_hash}"
-    })
+        def record(frame, captured_at):
+            # Promoter thread; the main thread adds no frames while recording
+            report_observation(frames.add(frame), frame, frame_sha256(frame), captured_at)
 
-    post_params(
-        f"{BACKEND_URL}/executions/{execution_id}/complete",
-        {"success": True, "pixels_changed": changed_pixels}
-    )
+        recording = (
+            ContinuousRecorder(
+                sct, record, fps=CAPTURE_FPS, slots=CAPTURE_SLOTS, monitor=monitor, region=region, reference=before,
+                display=backend.display,
+            )
+            if continuous else nullcontext()
+        )
 
-    print("CRE VERIFIED")
-    print(f"pixels_changed: {changed_pixels}")
-    print("action: real_os_input")
-    print("process: terminated")
-    sys.exit(0)
+        # ---- REAL OS ACTION ----
+        with recording:
+            # One mouse_trace action for the whole move, not one per sample
+            trace = MoveTrace()
+            started = now()
+            backend.move_to(x, y, duration=0.3, trace=trace)
+            reporter.emit("/actions", action_payload(execution_id, "mouse_trace", started, x=x, y=y, trace=trace))
+
+            reference = sample()
+            reporter.emit("/actions", action_payload(execution_id, "mouse_click", now(), x=x, y=y, button="left"))
+            backend.click()
+            wait_for_settle(sample, reference=reference, **settle)
+
+            reference = sample()
+            reporter.emit("/actions", action_payload(execution_id, "hotkey", now(), key="alt+f1"))
+            backend.hotkey("alt", "f1")
+            wait_for_settle(sample, reference=reference, **settle)
+
+        if continuous:
+            stats = recording.stats
+            print(f"continuous capture: {stats.captured} frames, {stats.promoted} promoted, "
+                  f"{stats.overruns} overruns, {stats.dropped} dropped")
+
+        after_at = now()
+        after = grab_frame(sct, monitor, region)
+        after_hash_future = hash_async(after)
+        after_ref = frames.add(after)
+
+        # Hashing runs on a worker thread while the delta is computed
+        delta = frame_delta(before, after)
+        after_hash = after_hash_future.result()
+        changed_pixels = delta.changed if delta else -1
+        if changed_pixels <= 0:
+            print("CRE FAILURE: no causal pixel change detected")
+            result["pixels_changed"] = changed_pixels
+            return result
 
+        report_observation(after_ref, after, after_hash, after_at)
+
+        reporter.emit("/artifacts", {
+            "execution_id": execution_id,
+            "artifact_type": "pixel_delta",
+            "storage_uri": "before->after",
+            "checksum": f"{before_hash}:{after_hash}"
+        })
+
+        print("CRE VERIFIED")
+        print(f"pixels_changed: {changed_pixels}")
+        # Regions are relative to the captured rect; report screen coordinates
+        print(f"capture_rect: {rect}")
+        print(f"changed_regions: {[(rx + rect[0], ry + rect[1], rw, rh) for rx, ry, rw, rh in delta.regions]}")
+        print(f"action: {backend.name}_input")
+        result.update(verified=True, pixels_changed=changed_pixels)
+        return result
+    finally:
+        # Every exit path completes the execution; anything but a verified
+        # run (early return, exception) is reported as failed. Observations
+        # are rejected once the execution is complete, so uploads go first.
+        for upload, path, payload in uploads:
+            try:
+                upload.result()
+            except Exception as e:
+                print(f"observation upload failed, spooled for retry: {e}", file=sys.stderr)
+                reporter.emit_upload(path, "/observations", payload)
+        reporter.emit(
+            f"/executions/{execution_id}/complete",
+            params={"success": result["verified"], "pixels_changed": result["pixels_changed"]}
+        )
+
+
+def main():
+    with Reporter(BACKEND_URL, SPOOL_PATH) as reporter, LocalBackend() as backend, FrameWriter() as writer, \
+            (Uploader(BACKEND_URL) if UPLOAD_TO_STORAGE else nullcontext()) as uploader:
+        result = run(reporter, backend, writer, uploader=uploader)
+
+    print("process: terminated")
+    sys.exit(0 if result["verified"] else 1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,163 @@
+"""
+Parallel multi-execution runner.
+
+Schedules executions across a process pool. Each worker process owns
+one display backend (its own Xvfb server by default), one frame writer
+and one reporter with a private spool, and runs its executions back to
+back; workers run concurrently, so executions per host scale with
+cores instead of running serially on the one real display.
+
+    python runner.py --executions 32 --workers 8 --backend xvfb
+    python runner.py --executions 32 --workers 8 --backend fake
+
+Worker i of a run uses display :(--base-display + i) and the spool
+report_spool.worker<i>.sqlite3 (unsent events from a previous run with
+the same worker count are replayed on the next one).
+"""
+
+import argparse
+import atexit
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backends import BACKENDS
+from capture import FrameWriter
+from reporting import Reporter
+from run_once import BACKEND_URL, OUT_DIR, ROI_SIZE, UPLOAD_TO_STORAGE, run
+from upload import Uploader
+
+BASE_DISPLAY = 90
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+_worker: dict = {}
+
+
+def _init_worker(counter, backend_name: str, base_display: int, size: tuple[int, int], backend_url: str) -> None:
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    width, height = size
+    if backend_name == "xvfb":
+        backend = BACKENDS["xvfb"](base_display + index, width, height)
+    elif backend_name == "fake":
+        backend = BACKENDS["fake"](width, height)
+    else:
+        backend = BACKENDS[backend_name]()
+
+    reporter = Reporter(backend_url, OUT_DIR / f"report_spool.worker{index}.sqlite3")
+    writer = FrameWriter()
+    uploader = Uploader(backend_url) if UPLOAD_TO_STORAGE else None
+    _worker.update(index=index, backend=backend, reporter=reporter, writer=writer, uploader=uploader)
+
+    # Spawned workers exit through sys.exit, so atexit handlers run
+    def close():
+        if uploader is not None:
+            uploader.close()
+        writer.close()
+        reporter.close()
+        backend.close()
+
+    atexit.register(close)
+
+
+def _run_job(job: dict) -> dict:
+    start = time.monotonic()
+    result = run(
+        _worker["reporter"],
+        _worker["backend"],
+        _worker["writer"],
+        environment=job.get("environment", "local-os-demo"),
+        continuous=job.get("continuous", False),
+        roi_size=job.get("roi_size", ROI_SIZE),
+        uploader=_worker["uploader"],
+    )
+    result["worker"] = _worker["index"]
+    result["elapsed"] = round(time.monotonic() - start, 3)
+    return result
+
+
+# -----------------------------
+# SCHEDULER
+# -----------------------------
+def run_many(
+    jobs: list[dict],
+    workers: int | None = None,
+    backend: str = "xvfb",
+    base_display: int = BASE_DISPLAY,
+    size: tuple[int, int] = (1920, 1080),
+    backend_url: str = BACKEND_URL,
+) -> list[dict]:
+    """
+    Run `jobs` ({"environment": ..., "continuous": ..., "roi_size": ...})
+    across a pool of `workers` processes (default: one per core). Results
+    are returned in job order; a job that raised is reported as
+    {"error": ...}.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}")
+    workers = workers or os.cpu_count() or 1
+    if backend == "local" and workers > 1:
+        raise ValueError("the local backend has a single display: use workers=1")
+
+    # spawn: workers must not inherit display/X11 connections or threads
+    ctx = mp.get_context("spawn")
+    counter = ctx.Value("i", 0)
+    results: list[dict | None] = [None] * len(jobs)
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)) or 1,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(counter, backend, base_display, size, backend_url),
+    ) as pool:
+        futures = {pool.submit(_run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = {"error": f"{type(e).__name__}: {e}"}
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--executions", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="xvfb")
+    parser.add_argument("--base-display", type=int, default=BASE_DISPLAY)
+    parser.add_argument("--size", default="1920x1080", help="WxH of each worker's display")
+    parser.add_argument("--environment", default="parallel-runner")
+    parser.add_argument("--backend-url", default=BACKEND_URL)
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.lower().split("x"))
+    jobs = [{"environment": args.environment} for _ in range(args.executions)]
+
+    start = time.monotonic()
+    results = run_many(jobs, args.workers, args.backend, args.base_display, (width, height), args.backend_url)
+    wall = time.monotonic() - start
+
+    verified = sum(1 for r in results if r.get("verified"))
+    print(json.dumps({
+        "backend": args.backend,
+        "executions": len(results),
+        "verified": verified,
+        "wall_s": round(wall, 3),
+        "executions_per_s": round(len(results) / wall, 2) if wall else None,
+        "results": results,
+    }, indent=2))
+    sys.exit(0 if verified == len(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from capture import Rect, grab_frame
+from delta import frame_delta
+
+
+# -----------------------------
+# SAMPLING
+# -----------------------------
+def preview_sampler(
+    sct, step: int = 4, monitor: int = 0, region: Rect | None = None
+) -> Callable[[], np.ndarray]:
+    """
+    Returns a callable producing a cheap, downscaled (every `step`-th pixel)
+    copy of the screen, or of `region`, for change polling.
+    """
+    def sample() -> np.ndarray:
+        return np.ascontiguousarray(grab_frame(sct, monitor, region)[::step, ::step])
+
+    return sample
+
+
+# -----------------------------
+# SETTLE DETECTION
+# -----------------------------
+@dataclass
+class SettleResult:
+    changed: bool
+    settled: bool
+    elapsed: float
+    samples: int
+
+
+def wait_for_settle(
+    sample: Callable[[], np.ndarray],
+    reference: np.ndarray | None = None,
+    require_change: bool = True,
+    stable_samples: int = 3,
+    interval: float = 0.03,
+    tolerance: int = 0,
+    change_timeout: float = 1.0,
+    timeout: float = 5.0,
+) -> SettleResult:
+    """
+    Poll until the screen has changed (relative to `reference`) and then
+    stayed identical for `stable_samples` consecutive samples.
+
+    require_change=False skips the first phase: wait only for quiescence.
+    If no change is seen within `change_timeout` the call returns with
+    changed=False. Never blocks longer than `timeout`.
+    A sample counts as different when more than `tolerance` pixels differ.
+    """
+    start = time.monotonic()
+    samples = 0
+
+    def differs(a: np.ndarray, b: np.ndarray) -> bool:
+        delta = frame_delta(a, b, threshold=tolerance + 1)
+        return delta is None or delta.changed > tolerance
+
+    prev = sample()
+    samples += 1
+    changed = not require_change
+
+    if require_change and reference is not None and differs(reference, prev):
+        changed = True
+
+    # Phase 1: wait for the action to have a visible effect
+    while not changed:
+        elapsed = time.monotonic() - start
+        if elapsed >= min(change_timeout, timeout):
+            return SettleResult(changed=False, settled=False, elapsed=elapsed, samples=samples)
+        time.sleep(interval)
+        cur = sample()
+        samples += 1
+        if differs(reference if reference is not None else prev, cur):
+            changed = True
+        prev = cur
+
+    # Phase 2: wait for N consecutive identical samples
+    stable = 0
+    while stable < stable_samples:
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            return SettleResult(changed=changed, settled=False, elapsed=elapsed, samples=samples)
+        time.sleep(interval)
+        cur = sample()
+        samples += 1
+        stable = 0 if differs(prev, cur) else stable + 1
+        prev = cur
+
+    return SettleResult(changed=changed, settled=True, elapsed=time.monotonic() - start, samples=samples)
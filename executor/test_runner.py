@@ -0,0 +1,96 @@
+"""
+run_many() over the in-memory FakeBackend, against a stub control plane.
+
+    python -m pytest executor/test_runner.py
+"""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from runner import run_many
+
+SIZE = (320, 240)
+# FakeBackend paints a 40x20 box under the (centred) cursor on click and a
+# 24px bar across the top on hotkey
+CLICK_PIXELS = 40 * 20
+HOTKEY_PIXELS = SIZE[0] * 24
+
+
+class StubBackend(BaseHTTPRequestHandler):
+    """
+    Accepts every report; /executions/start hands out execution ids.
+    """
+
+    requests: list[tuple[str, dict, object]]
+    lock: threading.Lock
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.lock:
+            self.requests.append((url.path, parse_qs(url.query), body))
+
+        response = {"id": str(uuid.uuid4())} if url.path == "/executions/start" else {}
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def backend_stub():
+    handler = type("Handler", (StubBackend,), {"requests": [], "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", handler.requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_run_many_fake_backend(backend_stub):
+    url, received = backend_stub
+    jobs = [
+        {"environment": "runner-test"},
+        {"environment": "runner-test"},
+        # Continuous capture needs an out-of-process display
+        {"environment": "runner-test", "continuous": True},
+        {"environment": "runner-test", "roi_size": (100, 60)},
+    ]
+
+    results = run_many(jobs, workers=2, backend="fake", size=SIZE, backend_url=url)
+
+    full, other, failed, roi = results
+    for result in (full, other, roi):
+        assert result["verified"] is True
+        assert result["worker"] in (0, 1)
+    assert len({full["execution_id"], other["execution_id"], roi["execution_id"]}) == 3
+    assert failed["error"].startswith("ValueError")
+
+    # The whole frame sees both the click and the hotkey; the ROI around
+    # the action point only sees the click
+    assert full["pixels_changed"] == CLICK_PIXELS + HOTKEY_PIXELS
+    assert roi["pixels_changed"] == CLICK_PIXELS
+
+    # Workers flush their reporters on exit: every started execution completed
+    starts = [r for r in received if r[0] == "/executions/start"]
+    completes = {
+        path.split("/")[2]: params["success"]
+        for path, params, _ in received
+        if path.endswith("/complete")
+    }
+    assert len(starts) == 3
+    assert completes == {r["execution_id"]: ["True"] for r in (full, other, roi)}
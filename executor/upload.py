@@ -0,0 +1,190 @@
+"""
+Direct uploads to object storage.
+
+The backend never sees object bytes: it hands out presigned URLs
+(POST /storage/uploads) and the executor PUTs the bytes straight to the
+S3-compatible store.
+
+- Keys are content-addressed (SHA-256 of the bytes): content the store
+  already has is not uploaded again.
+- Small files are one PUT; the backend signs their checksum header, so
+  the store rejects corrupted bytes.
+- Large files are uploaded as parts, `part_workers` at a time, each part
+  read from the file on its own (no whole-file buffering). Every part is
+  hashed first and its URL signs that SHA-256, so the store rejects
+  corrupted parts too.
+- upload() blocks; submit() runs it on the uploader's thread pool.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from ui_formats.hashing import sha256_file, sha256_stream
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Uploader:
+    def __init__(
+        self,
+        base_url: str,
+        workers: int = 4,
+        part_workers: int = 8,
+        timeout: float = 60,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.part_workers = part_workers
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=workers * part_workers + workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uploader")
+        self._parts = ThreadPoolExecutor(max_workers=part_workers, thread_name_prefix="uploader-part")
+
+    # -----------------------------
+    # PUBLIC
+    # -----------------------------
+    def upload(self, path: Path, content_type: str = "application/octet-stream") -> str:
+        """
+        Upload `path` (if the store lacks its content); returns its storage_uri.
+        """
+        sha256 = sha256_file(path, use_mmap=True)
+        size = path.stat().st_size
+        ticket = self._api("POST", "/storage/uploads", {
+            "sha256": sha256, "size": size, "content_type": content_type,
+        })
+        if ticket["exists"]:
+            return ticket["storage_uri"]
+
+        if ticket["upload_id"] is None:
+            with open(path, "rb") as f:
+                self._put(ticket["url"], f, ticket["headers"], size)
+            return ticket["storage_uri"]
+
+        try:
+            parts = self._upload_parts(path, size, sha256, ticket)
+        except Exception:
+            try:
+                self._api("DELETE", f"/storage/uploads/{ticket['upload_id']}", params={"sha256": sha256})
+            except (UploadError, requests.RequestException):
+                pass  # left to the bucket's incomplete-upload expiry
+            raise
+        done = self._api("POST", "/storage/uploads/complete", {
+            "sha256": sha256, "size": size, "upload_id": ticket["upload_id"], "parts": parts,
+        })
+        return done["storage_uri"]
+
+    def submit(
+        self,
+        path: Path,
+        after: Future | None = None,
+        then: Callable[[str], None] | None = None,
+        content_type: str = "application/octet-stream",
+    ) -> Future:
+        """
+        upload() on the pool: waits for `after` (e.g. the file's write)
+        first, and calls then(storage_uri) before the future resolves.
+        """
+        def task():
+            if after is not None:
+                after.result()
+            uri = self.upload(path, content_type)
+            if then is not None:
+                then(uri)
+            return uri
+
+        return self._pool.submit(task)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self._parts.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # INTERNAL
+    # -----------------------------
+    def _api(self, method: str, path: str, payload: dict | None = None, params: dict | None = None) -> dict | None:
+        r = self.session.request(method, f"{self.base_url}{path}", json=payload, params=params, timeout=self.timeout)
+        if r.status_code >= 400:
+            raise UploadError(f"{method} {path}: {r.status_code} {r.text[:200]}", r.status_code)
+        return r.json() if r.content else None
+
+    def _put(self, url: str, body, headers: dict, size: int) -> str:
+        r = self.session.put(url, data=body, headers={**headers, "Content-Length": str(size)}, timeout=self.timeout)
+        if r.status_code >= 400:
+            raise UploadError(f"PUT {url.split('?', 1)[0]}: {r.status_code} {r.text[:200]}", r.status_code)
+        return r.headers.get("ETag", "")
+
+    def _put_part(self, path: Path, offset: int, length: int, url: str, headers: dict) -> str:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return self._put(url, _Slice(f, length), headers, length)
+
+    @staticmethod
+    def _hash_part(path: Path, offset: int, length: int) -> str:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return sha256_stream(_Slice(f, length))
+
+    def _upload_parts(self, path: Path, size: int, sha256: str, ticket: dict) -> list[dict]:
+        part_size = ticket["part_size"]
+        spans = [
+            (n * part_size, min(part_size, size - n * part_size))
+            for n in range(ticket["part_count"])
+        ]
+        hashes = list(self._parts.map(lambda span: self._hash_part(path, *span), spans))
+        signed = self._api("POST", "/storage/uploads/parts", {
+            "sha256": sha256, "upload_id": ticket["upload_id"], "part_sha256": hashes,
+        })
+        futures = [
+            self._parts.submit(self._put_part, path, *span, part["url"], part["headers"])
+            for span, part in zip(spans, signed["parts"])
+        ]
+        return [
+            {"part_number": n, "etag": f.result(), "sha256": h}
+            for n, (f, h) in enumerate(zip(futures, hashes), 1)
+        ]
+
+
+class _Slice:
+    """
+    File-like view of `length` bytes from the current position of `f`,
+    so requests streams a part instead of reading it into memory.
+    """
+
+    def __init__(self, f, length: int):
+        self._f = f
+        self._remaining = length
+        self.len = length
+
+    def read(self, n: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        n = self._remaining if n is None or n < 0 else min(n, self._remaining)
+        data = self._f.read(n)
+        self._remaining -= len(data)
+        self.len = self._remaining
+        return data
+
+    def readinto(self, buf) -> int:
+        view = memoryview(buf)[:max(self._remaining, 0)]
+        n = self._f.readinto(view)
+        self._remaining -= n
+        self.len = self._remaining
+        return n
@@ -0,0 +1,13 @@
+"""
+Formats written by the executor and read back by the backend.
+
+Both sides import these modules instead of carrying their own copies, so
+an encoder and its decoder cannot drift apart:
+
+- hashing: SHA-256 helpers behind every stored checksum
+- frames:  keyframe + tile-delta frame segments (PZF1)
+- movetrace: compact mouse-move traces (MTR1)
+
+Pure standard library. The backend depends on it as a path dependency;
+for the executor, `pip install -e shared` from the repository root.
+"""
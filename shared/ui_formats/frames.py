@@ -0,0 +1,129 @@
+"""
+Keyframe + tile-delta frame segments.
+
+Every frame of an execution gets a sequence number. Keyframes store the
+frame whole; the others store only the tiles that changed since the
+previous frame. The executor encodes them (executor/framestore.py); the
+backend rebuilds a frame from its keyframe by applying every delta of the
+chain in sequence order. Frames are raw BGRA bytes, so the result can be
+checked against Observation.checksum (SHA-256 of the raw pixels).
+
+Segment format (little-endian), one blob per frame:
+
+    header  "<4sBIIBH"  magic b"PZF1", kind (0 key, 1 delta),
+                        height, width, channels, tile size
+    body    zlib(...)   key:   raw frame bytes (H * W * C)
+                        delta: u32 n, n * (u16 row, u16 col),
+                               then each tile's raw bytes in that order
+                               (edge tiles are cropped to the frame)
+
+Pure Python (struct + zlib): no image libraries needed to decode.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+
+from ui_formats.hashing import sha256_buffer
+
+MAGIC = b"PZF1"
+HEADER = struct.Struct("<4sBIIBH")
+KIND_KEY = 0
+KIND_DELTA = 1
+
+
+class FrameDecodeError(Exception):
+    pass
+
+
+@dataclass
+class Frame:
+    data: bytearray
+    height: int
+    width: int
+    channels: int
+
+
+def pack_header(kind: int, height: int, width: int, channels: int, tile: int) -> bytes:
+    return HEADER.pack(MAGIC, kind, height, width, channels, tile)
+
+
+def pack_delta_index(tiles: list[tuple[int, int]]) -> bytes:
+    """
+    Start of a delta body: the (row, col) of every tile that follows.
+    """
+    return struct.pack("<I", len(tiles)) + b"".join(struct.pack("<HH", r, c) for r, c in tiles)
+
+
+def apply_segment(frame: Frame | None, blob: bytes) -> Frame:
+    """
+    Apply one keyframe or delta segment; deltas update `frame` in place.
+    """
+    if len(blob) < HEADER.size:
+        raise FrameDecodeError("Truncated frame header")
+    magic, kind, height, width, channels, tile = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise FrameDecodeError("Not a frame segment")
+
+    try:
+        body = zlib.decompress(memoryview(blob)[HEADER.size:])
+    except zlib.error as e:
+        raise FrameDecodeError(f"Corrupt frame segment: {e}") from e
+
+    if kind == KIND_KEY:
+        if len(body) != height * width * channels:
+            raise FrameDecodeError("Keyframe size does not match its header")
+        return Frame(bytearray(body), height, width, channels)
+
+    if kind != KIND_DELTA:
+        raise FrameDecodeError(f"Unknown segment kind {kind}")
+    if frame is None:
+        raise FrameDecodeError("Delta segment without a keyframe")
+    if (frame.height, frame.width, frame.channels) != (height, width, channels):
+        raise FrameDecodeError("Delta segment does not match the frame geometry")
+
+    if len(body) < 4:
+        raise FrameDecodeError("Truncated delta index")
+    (n,) = struct.unpack_from("<I", body)
+    offset = 4 + 4 * n
+    if len(body) < offset:
+        raise FrameDecodeError("Truncated delta index")
+    tiles = struct.unpack_from(f"<{2 * n}H", body, 4)
+
+    # Check the whole index before touching the frame: a bad segment
+    # must not leave it half updated
+    size = offset
+    for i in range(n):
+        y0, x0 = tiles[2 * i] * tile, tiles[2 * i + 1] * tile
+        if y0 >= height or x0 >= width:
+            raise FrameDecodeError(f"Delta tile ({tiles[2 * i]}, {tiles[2 * i + 1]}) is outside the frame")
+        size += min(tile, height - y0) * min(tile, width - x0) * channels
+    if size != len(body):
+        raise FrameDecodeError("Delta segment size does not match its index")
+
+    stride = width * channels
+    data = frame.data
+    for i in range(n):
+        y0, x0 = tiles[2 * i] * tile, tiles[2 * i + 1] * tile
+        rows = min(tile, height - y0)
+        span = min(tile, width - x0) * channels
+        for y in range(y0, y0 + rows):
+            start = y * stride + x0 * channels
+            data[start:start + span] = body[offset:offset + span]
+            offset += span
+    return frame
+
+
+def decode_chain(blobs: list[bytes], checksum: str | None = None) -> Frame:
+    """
+    Rebuild the last frame of a keyframe + deltas chain; verify it against
+    `checksum` when given.
+    """
+    frame = None
+    for blob in blobs:
+        frame = apply_segment(frame, blob)
+    if frame is None:
+        raise FrameDecodeError("Empty frame chain")
+    if checksum is not None and sha256_buffer(frame.data) != checksum:
+        raise FrameDecodeError("Reconstructed frame does not match its checksum")
+    return frame
@@ -0,0 +1,56 @@
+"""
+Memory-bounded SHA-256 helpers.
+
+Checksums written by the executor are verified by the backend with these
+same functions.
+
+- Files are streamed in fixed-size chunks (or hashed through mmap),
+  never read whole.
+- In-memory buffers (bytes, memoryview, contiguous NumPy arrays) are
+  hashed in place, without copying.
+"""
+
+import hashlib
+import mmap
+from pathlib import Path
+from typing import BinaryIO
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def sha256_stream(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> str:
+    h = hashlib.sha256()
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        h.update(view[:n])
+    return h.hexdigest()
+
+
+def sha256_file(path: Path, chunk_size: int = CHUNK_SIZE, use_mmap: bool = False) -> str:
+    with open(path, "rb") as f:
+        if use_mmap:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    h = hashlib.sha256()
+                    view = memoryview(m)
+                    try:
+                        for i in range(0, len(m), chunk_size):
+                            h.update(view[i:i + chunk_size])
+                    finally:
+                        view.release()
+                    return h.hexdigest()
+            except ValueError:
+                # Empty files cannot be mapped
+                pass
+        return sha256_stream(f, chunk_size)
+
+
+def sha256_buffer(buf) -> str:
+    """
+    Hash any C-contiguous buffer-protocol object in place.
+    """
+    return hashlib.sha256(memoryview(buf).cast("B")).hexdigest()
@@ -0,0 +1,89 @@
+"""
+Compact binary encoding of mouse-move traces.
+
+A move is shipped as one action carrying all of its samples instead of
+one action per sample. Consecutive samples differ by a few pixels and
+milliseconds, so each is stored as zigzag varint deltas (dx, dy, dt):
+typically 3 bytes per sample.
+
+    header  "<4sIii"  magic b"MTR1", sample count, x0, y0
+    body    per sample after the first: varint zigzag(dx),
+            varint zigzag(dy), varint dt_ms
+
+Times are milliseconds relative to the first sample (the action's
+occurred_at). Encoded by the executor, decoded by the backend.
+"""
+
+import struct
+
+MAGIC = b"MTR1"
+HEADER = struct.Struct("<4sIii")
+MAX_POINTS = 1_000_000
+
+
+class TraceDecodeError(Exception):
+    pass
+
+
+def _varint(n: int, out: bytearray) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        if pos >= len(data):
+            raise TraceDecodeError("Truncated trace")
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+        if shift > 63:
+            raise TraceDecodeError("Varint too long")
+
+
+def encode_trace(points: list[tuple[int, int, int]]) -> bytes:
+    """points: (t_ms, x, y), in time order."""
+    if not points:
+        raise ValueError("empty trace")
+    t0, x0, y0 = points[0]
+    out = bytearray(HEADER.pack(MAGIC, len(points), x0, y0))
+    pt, px, py = t0, x0, y0
+    for t, x, y in points[1:]:
+        dx, dy = x - px, y - py
+        _varint((dx << 1) ^ (dx >> 63), out)
+        _varint((dy << 1) ^ (dy >> 63), out)
+        _varint(max(0, t - pt), out)
+        pt, px, py = max(t, pt), x, y
+    return bytes(out)
+
+
+def decode_trace(data: bytes) -> list[tuple[int, int, int]]:
+    """(t_ms, x, y) samples, relative to the first one."""
+    if len(data) < HEADER.size:
+        raise TraceDecodeError("Truncated trace header")
+    magic, count, x, y = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise TraceDecodeError("Not a mouse trace")
+    if not 0 < count <= MAX_POINTS:
+        raise TraceDecodeError(f"Invalid sample count {count}")
+
+    t = 0
+    points = [(t, x, y)]
+    pos = HEADER.size
+    for _ in range(count - 1):
+        zx, pos = _read_varint(data, pos)
+        zy, pos = _read_varint(data, pos)
+        dt, pos = _read_varint(data, pos)
+        x += (zx >> 1) ^ -(zx & 1)
+        y += (zy >> 1) ^ -(zy & 1)
+        t += dt
+        points.append((t, x, y))
+    if pos != len(data):
+        raise TraceDecodeError("Trailing bytes after trace")
+    return points